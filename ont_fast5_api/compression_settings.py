@@ -1,14 +1,15 @@
-import pkg_resources
+import os
 
 
 def register_plugin():
-    plugin_path = pkg_resources.resource_filename('ont_fast5_api', 'vbz_plugin')
+    # The plugin is installed as package data alongside this module.
+    # NB: pkg_resources.resource_filename gave the same path, but importing pkg_resources is slow
+    plugin_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vbz_plugin')
     try:
         from h5py import h5pl
         h5pl.prepend(bytes(plugin_path, 'UTF-8'))
     except (ImportError, AttributeError):
         # We don't have the plugin library in h5py<2.10 so we fall back on an environment variable
-        import os
         os.environ['HDF5_PLUGIN_PATH'] = plugin_path
     return plugin_path
 
@@ -87,3 +88,5 @@ VBZ = VbzCompression()
 GZIP = GzipCompression()
 
 COMPRESSION_MAP = {str(comp): comp for comp in (VBZ_ALPHA, VBZ, GZIP)}
+# Valid '--compression' argument values for tools where omitting it keeps the input compression
+COMPRESSION_CHOICES = tuple(COMPRESSION_MAP) + (None,)
@@ -6,7 +6,8 @@ from multiprocessing.pool import Pool
 
 from ont_fast5_api import __version__
 from ont_fast5_api.compression_settings import COMPRESSION_MAP
-from ont_fast5_api.conversion_tools.conversion_utils import get_fast5_file_list, get_progress_bar
+from ont_fast5_api.conversion_tools.conversion_utils import get_fast5_file_list, get_progress_bar, \
+    CHUNK_CACHE_SETTINGS, INPUT_FILE_SETTINGS
 from ont_fast5_api.fast5_file import Fast5File, EmptyFast5
 from ont_fast5_api.fast5_read import copy_attributes
 from ont_fast5_api.fast5_interface import is_multi_read
@@ -54,12 +55,13 @@ def compress_file(input_file, output_file, target_compression, sanitize=False):
     try:
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
         if is_multi_read(input_file):
-            with MultiFast5File(input_file, 'r') as input_f5, MultiFast5File(output_file, 'a') as output_f5:
+            with MultiFast5File(input_file, 'r', **INPUT_FILE_SETTINGS) as input_f5, \
+                    MultiFast5File(output_file, 'a', **CHUNK_CACHE_SETTINGS) as output_f5:
                 for read in input_f5.get_reads():
                     output_f5.add_existing_read(read, target_compression, sanitize=sanitize)
         else:
-            with Fast5File(input_file, 'r') as input_f5, \
-                    EmptyFast5(output_file, 'a') as output_f5:
+            with Fast5File(input_file, 'r', **INPUT_FILE_SETTINGS) as input_f5, \
+                    EmptyFast5(output_file, 'a', **CHUNK_CACHE_SETTINGS) as output_f5:
                 compress_single_read(output_f5, input_f5, target_compression, sanitize=sanitize)
     except Exception as e:
         # Error raised in Pool.async will be lost so we explicitly print them.
@@ -69,7 +71,7 @@ def compress_file(input_file, output_file, target_compression, sanitize=False):
 
 
 def compress_single_read(output_f5, read_to_copy, target_compression, sanitize=False):
-    read_id = read_to_copy.get_read_id()
+    read_id = read_to_copy.read_id
     raw_dataset_name = read_to_copy.raw_dataset_name
     raw_group_name = read_to_copy.raw_dataset_group_name
     read_name = "read_" + read_id
@@ -1,11 +1,15 @@
 import multiprocessing
+import multiprocessing.pool
 import os
+import threading
 
+from collections import OrderedDict
 from glob import glob
 from math import ceil
 from pathlib import Path
 from typing import List, Optional, Set, Tuple, Iterator
 
+import h5py
 from progressbar import RotatingMarker, ProgressBar, SimpleProgress, Bar, Percentage, ETA
 from logging import Logger
 
@@ -16,6 +20,28 @@ from ont_fast5_api.fast5_read import Fast5Read
 
 READS_PER_FILE = 4000
 FILENAME_BASE = "batch"
+# h5py.File chunk cache settings used when copying reads between files (h5py default is 1MiB)
+CHUNK_CACHE_SETTINGS = {"rdcc_nbytes": 16 * 1024 * 1024}
+
+
+def _file_locking_option_supported():
+    # h5py>=3.5 has the 'locking' option, but h5py.File raises a ValueError for it
+    # unless the HDF5 library is also new enough: 1.10.x from 1.10.7, or 1.12.1 onwards
+    if h5py.version.version_tuple < (3, 5):
+        return False
+    hdf5_version = tuple(h5py.version.hdf5_version_tuple)
+    return hdf5_version >= (1, 12, 1) or (1, 10, 7) <= hdf5_version < (1, 11)
+
+
+# Input files are only ever opened read-only, so HDF5 file locking just adds contention between worker processes
+# (and can fail outright on some network filesystems)
+INPUT_FILE_SETTINGS = dict(CHUNK_CACHE_SETTINGS)
+if _file_locking_option_supported():
+    INPUT_FILE_SETTINGS["locking"] = False
+
+# Input files which are not exhausted are requeued, so keep the read_ids of the last few files opened
+READ_ID_CACHE_SIZE = 16
+_read_id_cache = OrderedDict()
 
 
 def batcher(iterable, n=1):
@@ -39,16 +65,38 @@ def yield_fast5_files(input_path, recursive, follow_symlinks=True):
         return
 
     if recursive:
-        for root, _, filenames in os.walk(input_path, followlinks=follow_symlinks):
-            for filename in filenames:
-                if not filename.endswith('.fast5'): continue
-                yield os.path.join(root, filename)
+        yield from _scan_fast5_files(input_path, follow_symlinks)
     else:
         for filename in glob(os.path.join(input_path, '*.fast5')):
             yield filename
     return
 
 
+def _scan_fast5_files(directory, follow_symlinks):
+    """
+    Recursively yield fast5 file paths below directory, using os.scandir so each entry is only stat'ed when needed
+    Files are yielded before descending into subdirectories, matching the top-down order of os.walk
+
+    :param directory: path
+    :param follow_symlinks: bool descend into symlinked directories
+    :return:
+    """
+    subdirectories = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if follow_symlinks or not entry.is_symlink():
+                        subdirectories.append(entry.path)
+                elif entry.name.endswith('.fast5'):
+                    yield entry.path
+    except OSError:
+        # Consistent with os.walk we skip directories which can't be listed
+        return
+    for subdirectory in subdirectories:
+        yield from _scan_fast5_files(subdirectory, follow_symlinks)
+
+
 def yield_fast5_reads(input_path, recursive, follow_symlinks=True, read_ids=None):
     """
     Iterate over reads in fast5 files and yield read_ids and fast5 read objects.
@@ -138,10 +186,14 @@ class Fast5FilterWorker:
             self.filename_mapping_file.unlink()
 
         self.out_files = {}  # dict where key=filename value=read_set
+        self.reads_extracted = 0  # running total of reads across all out_files
         self.available_out_files = []
         self.populate_out_files()
-        self.tasks = []
+        self.tasks = 0  # number of async tasks in flight
         self.pool = None
+        # callbacks arrive on the pool's result thread, so task scheduling is serialised with this lock
+        self._task_lock = threading.RLock()
+        self._tasks_done = threading.Event()
 
     def populate_out_files(self) -> None:
         """
@@ -162,7 +214,7 @@ class Fast5FilterWorker:
         # reversing so that first item to be popped is lower idx
         self.available_out_files = sorted(self.out_files.keys(), reverse=True)
 
-    def run_batch(self, pool: multiprocessing.Pool=None) -> None:
+    def run_batch(self, pool: Optional[multiprocessing.pool.Pool] = None) -> None:
         """
         Choose sync or async (if multiprocessing.Pool is provided) running mode, launch tasks.
         :param pool:
@@ -174,6 +226,13 @@ class Fast5FilterWorker:
             self.pool = pool
             self._launch_async_tasks()
 
+    def wait(self) -> None:
+        """
+        Block until all async tasks launched by run_batch(pool=...) have completed
+        :return:
+        """
+        self._tasks_done.wait()
+
     def _launch_sync_tasks(self) -> None:
         """
         Run tasks sequentially
@@ -187,13 +246,19 @@ class Fast5FilterWorker:
         """
         Launch an async task for every input-output pair
         self.tasks is just for keeping track of number of tasks still running
+        Once no tasks are left running, signal anyone waiting on the worker
         :return:
         """
-        for args_tuple in self._args_generator():
-            self.pool.apply_async(func=extract_selected_reads, args=args_tuple,
-                                  callback=self._callback, error_callback=self._error_callback)
-
-            self.tasks.append(0)
+        with self._task_lock:
+            for in_file, out_file, read_set, count, compression in self._args_generator():
+                self.tasks += 1
+                # The pool pickles task arguments later, on its own thread and outside this lock, while callbacks
+                # shrink self.read_set in place. Snapshot it here, under the lock, so pickling never sees it change
+                self.pool.apply_async(func=extract_selected_reads,
+                                      args=(in_file, out_file, read_set.copy(), count, compression),
+                                      callback=self._callback, error_callback=self._error_callback)
+            if not self.tasks and not self._tasks_done.is_set():
+                self._tasks_done.set()
 
     def _callback(self, result) -> None:
         """
@@ -201,15 +266,17 @@ class Fast5FilterWorker:
         :param result: tuple
         :return:
         """
-        self._update_file_lists(*result)
-        self._launch_async_tasks()
-        self.tasks.pop()
+        with self._task_lock:
+            self.tasks -= 1
+            self._update_file_lists(*result)
+            self._launch_async_tasks()
 
     def _error_callback(self, result) -> None:
-        self.logger.error(result.original_exception)
-        self._update_file_lists(set(), result.output_file, None)
-        self._launch_async_tasks()
-        self.tasks.pop()
+        with self._task_lock:
+            self.tasks -= 1
+            self.logger.error(result.original_exception)
+            self._update_file_lists(set(), result.output_file, None)
+            self._launch_async_tasks()
 
     def _update_file_lists(self, reads, out_file, in_file) -> None:
         """
@@ -226,21 +293,34 @@ class Fast5FilterWorker:
             in_file_exhausted = 0
             self.input_f5s.append(in_file)
 
-        self.out_files[out_file].update(reads)
+        out_file_reads = self.out_files[out_file]
+        num_reads_before = len(out_file_reads)
+        out_file_reads.update(reads)
+        self.reads_extracted += len(out_file_reads) - num_reads_before
         self.read_set.difference_update(reads)
 
-        if len(self.out_files[out_file]) < self.batch_size:
+        if len(out_file_reads) < self.batch_size:
             # out_file has not reached batch limit
             self.available_out_files.append(out_file)
 
-        # print filename - read table
-        with open(str(self.filename_mapping_file), 'a') as output_table:
-            for read in reads:
-                output_table.write("{}\t{}\n".format(read, out_file.name))
+        # record filename - read table
+        self._write_filename_mapping(reads, out_file)
 
         # increment progressbar by number of reads found and by number of files processed
         self.pbar.update(self.pbar.currval + len(reads) + in_file_exhausted)
 
+    def _write_filename_mapping(self, reads, out_file) -> None:
+        """
+        Append the read - filename lines for one finished task
+        These are written as each task completes, so the table stays complete for every output file written so far
+        even if the run is interrupted
+        :param reads:
+        :param out_file:
+        :return:
+        """
+        with open(str(self.filename_mapping_file), 'a') as output_table:
+            output_table.writelines("{}\t{}\n".format(read, out_file.name) for read in reads)
+
     def _args_generator(self) -> Iterator[Tuple[Path, Path, Set[str], int, Optional[str]]]:
         """
         If there are possible pairs of input and output files, yield tuples that are suitable inputs to
@@ -254,6 +334,36 @@ class Fast5FilterWorker:
             yield in_file, out_file, self.read_set, count, self.target_compression
 
 
+def run_pool(workers: List[Fast5FilterWorker], num_processes: int,
+             pool: Optional[multiprocessing.pool.Pool] = None) -> None:
+    """
+    Run a list of Fast5FilterWorkers to completion
+    Workers share a single multiprocessing.Pool if num_processes > 1, otherwise they are run sequentially
+    If an existing pool is provided it is used instead, and left open so it can be reused by the caller
+    :param workers: list of Fast5FilterWorker
+    :param num_processes: int maximum number of worker processes
+    :param pool: optional multiprocessing.Pool owned by the caller
+    :return:
+    """
+    if pool is not None:
+        for worker in workers:
+            worker.run_batch(pool=pool)
+        for worker in workers:
+            worker.wait()
+    elif num_processes > 1:
+        with multiprocessing.Pool(num_processes) as pool:
+            for worker in workers:
+                worker.run_batch(pool=pool)
+            for worker in workers:
+                worker.wait()
+
+            pool.close()
+            pool.join()
+    else:
+        for worker in workers:
+            worker.run_batch(pool=None)
+
+
 def extract_selected_reads(
         input_file: Path,
         output_file: Path,
@@ -275,16 +385,15 @@ def extract_selected_reads(
     """
     try:
         found_reads = set()
-        with MultiFast5File(str(output_file), 'a') as output_f5:
-            reads_present = set(output_f5.get_read_ids())
+        with MultiFast5File(str(output_file), 'a', **CHUNK_CACHE_SETTINGS) as output_f5:
+            output_handle = output_f5.handle
             for read_id, read in read_generator(input_file, read_set):
                 found_reads.add(read_id)
 
-                if read_id in reads_present:
+                if "read_" + read_id in output_handle:
                     continue
 
                 output_f5.add_existing_read(read, target_compression=target_compression)
-                reads_present.add(read_id)
 
                 if len(found_reads) >= count:
                     return found_reads, output_file, input_file
@@ -309,8 +418,29 @@ def read_generator(input_file: Path, read_set: Set[str]) -> Iterator[Tuple[str,
     :param read_set: set of read_ids to look for
     :return: tuples of (read_id, read object)
     """
-    with get_fast5_file(str(input_file)) as input_f5:
-        read_ids = input_f5.get_read_ids()
-        for read_id in read_set.intersection(read_ids):
-            read = input_f5.get_read(read_id)
-            yield read_id, read
+    with get_fast5_file(str(input_file), **INPUT_FILE_SETTINGS) as input_f5:
+        # Test membership lazily rather than building the full intersection, as callers stop after count reads
+        for read_id in get_cached_read_ids(input_f5, input_file):
+            if read_id in read_set:
+                yield read_id, input_f5.get_read(read_id)
+
+
+def get_cached_read_ids(input_f5, input_file: Path) -> Tuple[str, ...]:
+    """
+    Return input_f5.get_read_ids(), reusing the result from a previous call if the file has not been modified since
+    The same object is returned to every caller, so it is a tuple rather than a list that could be changed in place
+    Checking for modification costs one os.stat per call, which is small next to opening the fast5 file itself
+    :param input_f5: open Fast5File or MultiFast5File
+    :param input_file: Path to input_f5
+    :return: tuple of read_ids
+    """
+    key = (str(input_file), os.stat(str(input_file)).st_mtime_ns)
+    read_ids = _read_id_cache.get(key)
+    if read_ids is None:
+        read_ids = tuple(input_f5.get_read_ids())
+        _read_id_cache[key] = read_ids
+        if len(_read_id_cache) > READ_ID_CACHE_SIZE:
+            _read_id_cache.popitem(last=False)
+    else:
+        _read_id_cache.move_to_end(key)
+    return read_ids
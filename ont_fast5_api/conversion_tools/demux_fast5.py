@@ -4,19 +4,20 @@ Inteded for demultiplexing reads using barcoding summary file.
 """
 from pathlib import Path
 from typing import Union, Dict, Set, List
-from multiprocessing import Pool
+from multiprocessing.pool import Pool
 import logging
 from csv import reader
 from collections import defaultdict
-from time import sleep
 from math import ceil
+from operator import itemgetter
 from argparse import ArgumentParser
 
-from ont_fast5_api.compression_settings import COMPRESSION_MAP
+from ont_fast5_api.compression_settings import COMPRESSION_MAP, COMPRESSION_CHOICES
 from ont_fast5_api.conversion_tools.conversion_utils import (
     get_fast5_file_list,
     get_progress_bar,
     Fast5FilterWorker,
+    run_pool,
     READS_PER_FILE,
     FILENAME_BASE,
     ProgressBar,
@@ -40,6 +41,7 @@ class Fast5Demux:
     :param recursive: bool flag to search recursively through input_dir for Fast5 files
     :param follow_symlinks: bool flag to follow symlinks in input_dir
     :param target_compression: str compression type in output Fast5 files
+    :param pool: optional multiprocessing.Pool to run workers on, which is left open for reuse by the caller
     """
 
     def __init__(
@@ -55,6 +57,7 @@ class Fast5Demux:
         recursive: bool = False,
         follow_symlinks: bool = True,
         target_compression: Union[str, None] = None,
+        pool: Union[Pool, None] = None,
     ):
         self.input_dir = input_dir
         self.output_dir = output_dir
@@ -67,6 +70,7 @@ class Fast5Demux:
         self.recursive = recursive
         self.follow_symlinks = follow_symlinks
         self.target_compression = target_compression
+        self.pool = pool
 
         self.read_sets: Dict[str, Set[str]] = {}
         self.input_fast5s: List[Path] = []
@@ -92,20 +96,7 @@ class Fast5Demux:
         :return:
         """
         self.workers_setup()
-
-        if self.max_threads > 1:
-            with Pool(self.max_threads) as pool:
-                for worker in self.workers:
-                    worker.run_batch(pool=pool)
-                while any(worker.tasks for worker in self.workers):
-                    sleep(1)
-
-            pool.join()
-            pool.close()
-        else:
-            for worker in self.workers:
-                worker.run_batch(pool=None)
-
+        run_pool(self.workers, self.max_threads, pool=self.pool)
         self.progressbar.finish()
 
     def workers_setup(self) -> None:
@@ -146,11 +137,7 @@ class Fast5Demux:
         Log summary of work done
         :return:
         """
-        total_reads = 0
-        for idx, _ in enumerate(sorted(self.read_sets)):
-            worker = self.workers[idx]
-            for file, reads in worker.out_files.items():
-                total_reads += len(reads)
+        total_reads = sum(worker.reads_extracted for worker in self.workers)
 
         self.logger.info("{} reads extracted".format(total_reads))
 
@@ -202,9 +189,9 @@ class Fast5Demux:
                     )
                 )
 
+            get_columns = itemgetter(read_id_col_idx, demultiplex_col_idx)
             for line in read_list_tsv:
-                read_id = line[read_id_col_idx]
-                demux = line[demultiplex_col_idx]
+                read_id, demux = get_columns(line)
                 read_sets[demux].add(read_id)
 
         return read_sets
@@ -278,7 +265,7 @@ def create_arg_parser():
         "--compression",
         required=False,
         default=None,
-        choices=list(COMPRESSION_MAP.keys()) + [None],
+        choices=COMPRESSION_CHOICES,
         help="Target output compression type. If omitted - don't change compression type",
     )
     parser.add_argument(
@@ -1,17 +1,14 @@
 """Filter Fast5 files based on read_id list
 """
-import csv
 import logging
 from argparse import ArgumentParser
 from math import ceil
-from multiprocessing import Pool
 from os import makedirs, path
 from pathlib import Path
-from time import sleep
 
-from ont_fast5_api.compression_settings import COMPRESSION_MAP
+from ont_fast5_api.compression_settings import COMPRESSION_MAP, COMPRESSION_CHOICES
 from ont_fast5_api.conversion_tools.conversion_utils import get_fast5_file_list, get_progress_bar, Fast5FilterWorker
-from ont_fast5_api.conversion_tools.conversion_utils import READS_PER_FILE, FILENAME_BASE
+from ont_fast5_api.conversion_tools.conversion_utils import READS_PER_FILE, FILENAME_BASE, run_pool
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -20,11 +17,13 @@ class Fast5Filter:
     """
     Extract reads listed read_list_file from fast5 files in input_folder, write to multi-fast5 files in
     output_folder
+    An existing multiprocessing.Pool may be given as pool (e.g. to reuse it across many filters), in which case it
+    is used instead of creating one per run_batch and is not closed
     """
 
     def __init__(self, input_folder, output_folder, read_list_file, filename_base=FILENAME_BASE,
                  batch_size=READS_PER_FILE, threads=1, recursive=False, file_list_file=None, follow_symlinks=True,
-                 target_compression=None):
+                 target_compression=None, pool=None):
         assert path.isdir(input_folder)
         assert path.isfile(read_list_file)
         assert isinstance(filename_base, str)
@@ -32,6 +31,7 @@ class Fast5Filter:
         assert isinstance(threads, int)
         assert isinstance(recursive, bool)
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.pool = pool
 
         self.read_set = parse_summary_file(read_list_file)
         self.input_f5s = get_fast5_file_list(str(input_folder), recursive, follow_symlinks=follow_symlinks)
@@ -76,21 +76,9 @@ class Fast5Filter:
         )
 
     def run_batch(self):
-
-        if self.num_workers == 1:
-            self.worker.run_batch(pool=None)
-        else:
-            with Pool(self.num_workers) as pool:
-                self.worker.run_batch(pool=pool)
-
-                while self.worker.tasks:
-                    sleep(1)
-
-                pool.close()
-                pool.join()
-
+        run_pool([self.worker], self.num_workers, pool=self.pool)
         self.pbar.finish()
-        self.logger.info("{} reads extracted".format(sum(len(v) for v in self.worker.out_files.values())))
+        self.logger.info("{} reads extracted".format(self.worker.reads_extracted))
 
         # report reads not found
         if len(self.worker.read_set) > 0:
@@ -107,8 +95,7 @@ def parse_summary_file(read_list_file):
     """
     reads = set()
     with open(str(read_list_file), 'r') as fh:
-        read_list_tsv = csv.reader(fh, delimiter='\t')
-        header = next(read_list_tsv)
+        header = fh.readline().rstrip('\r\n').split('\t')
 
         if "read_id" in header:
             col_idx = header.index("read_id")
@@ -119,8 +106,12 @@ def parse_summary_file(read_list_file):
             else:
                 raise TypeError("multi-column file without 'read_id' column")
 
-        for line in read_list_tsv:
-            reads.add(line[col_idx].strip())
+        # Splitting lines directly is much faster than csv.reader for the (unquoted) read lists we expect
+        if len(header) == 1:
+            reads.update(line.strip() for line in fh)
+        else:
+            reads.update(line.split('\t', col_idx + 1)[col_idx].strip() for line in fh if line.strip())
+    reads.discard('')  # ignore blank lines
     if len(reads) < 1:
         raise ValueError("No reads in read list file {}".format(read_list_file))
     return reads
@@ -145,7 +136,7 @@ def main():
     parser.add_argument('--ignore_symlinks', action='store_true',
                         help="Ignore symlinks when searching recursively for fast5 files")
     parser.add_argument('-c', '--compression', required=False, default=None,
-                        choices=list(COMPRESSION_MAP.keys()) + [None], help="Target output compression type")
+                        choices=COMPRESSION_CHOICES, help="Target output compression type")
     parser.add_argument('--file_list', required=False,
                         help="File containing names of files to search in")
     args = parser.parse_args()
@@ -2,9 +2,12 @@ from argparse import ArgumentParser
 from multiprocessing import Pool
 import logging
 import os
+from math import ceil
+
+import h5py
 
 from ont_fast5_api import __version__
-from ont_fast5_api.conversion_tools.conversion_utils import get_fast5_file_list, get_progress_bar
+from ont_fast5_api.conversion_tools.conversion_utils import get_fast5_file_list, get_progress_bar, INPUT_FILE_SETTINGS
 from ont_fast5_api.fast5_file import EmptyFast5, Fast5FileTypeError
 from ont_fast5_api.fast5_interface import check_file_type, MULTI_READ
 from ont_fast5_api.multi_fast5 import MultiFast5File
@@ -14,54 +17,71 @@ logger = logging.getLogger(__name__)
 exc_info = False
 
 
-def batch_convert_multi_files_to_single(input_path, output_folder, threads, recursive, follow_symlinks):
-    pool = Pool(threads)
+def batch_convert_multi_files_to_single(input_path, output_folder, threads, recursive, follow_symlinks,
+                                        external_links=False):
     file_list = get_fast5_file_list(input_path, recursive, follow_symlinks=follow_symlinks)
-    pbar = get_progress_bar(len(file_list))
-
-    def update(result):
-        input_file = result[0]
-        with open(os.path.join(output_folder, "filename_mapping.txt"), 'a') as output_table:
-            for filename in result[1]:
-                output_table.write("{}\t{}\n".format(input_file, filename))
-        pbar.update(pbar.currval + 1)
+    # If there are fewer files than threads, split the reads of each file across several tasks
+    splits_per_file = max(1, int(ceil(threads / len(file_list)))) if file_list else 1
+    pbar = get_progress_bar(len(file_list) * splits_per_file)
 
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    results_array = []
-    for batch_num, filename in enumerate(file_list):
-        results_array.append(pool.apply_async(convert_multi_to_single,
-                                              args=(filename, output_folder,
-                                                    str(batch_num)),
-                                              callback=update))
+    def task_args():
+        for batch_num, filename in enumerate(file_list):
+            for split in range(splits_per_file):
+                read_slice = slice(split, None, splits_per_file) if splits_per_file > 1 else None
+                yield filename, output_folder, str(batch_num), read_slice, external_links
+
+    # Results are consumed here as they complete, so the mapping file is only ever written from this thread
+    # A failing task is re-raised from imap_unordered, the pool is then terminated on leaving the with block
+    try:
+        with Pool(threads) as pool:
+            with open(os.path.join(output_folder, "filename_mapping.txt"), 'a') as output_table:
+                for input_file, output_files in pool.imap_unordered(_convert_multi_to_single_from_args, task_args()):
+                    output_table.write("".join("{}\t{}\n".format(input_file, filename) for filename in output_files))
+                    pbar.update(pbar.currval + 1)
 
-    pool.close()
-    pool.join()
-    pbar.finish()
+            pool.close()
+            pool.join()
+    finally:
+        pbar.finish()
 
 
-def convert_multi_to_single(input_file, output_folder, subfolder):
+def _convert_multi_to_single_from_args(args):
+    return convert_multi_to_single(*args)
+
+
+def convert_multi_to_single(input_file, output_folder, subfolder, read_slice=None, external_links=False):
     output_files = ()
     try:
-        output_files = try_multi_to_single_conversion(input_file, output_folder, subfolder)
+        output_files = try_multi_to_single_conversion(input_file, output_folder, subfolder, read_slice,
+                                                      external_links)
     except Exception as e:
         logger.error("{}\n\tFailed to copy files from: {}"
                      "".format(e, input_file), exc_info=exc_info)
     return input_file, output_files
 
 
-def try_multi_to_single_conversion(input_file, output_folder, subfolder):
+def try_multi_to_single_conversion(input_file, output_folder, subfolder, read_slice=None, external_links=False):
+    # read_slice optionally selects a subset of the read_ids, so one input file can be split across several tasks
     output_files = []
-    with MultiFast5File(input_file, 'r') as multi_f5:
+    with MultiFast5File(input_file, 'r', **INPUT_FILE_SETTINGS) as multi_f5:
         file_type = check_file_type(multi_f5)
         if file_type != MULTI_READ:
             raise Fast5FileTypeError("Could not convert Multi->Single for file type '{}' with path '{}'"
                                      "".format(file_type, input_file))
-        for read in multi_f5.get_reads():
+        # Every read goes to the same subfolder, so create it once here rather than in create_single_f5
+        output_dir = os.path.join(output_folder, subfolder)
+        os.makedirs(output_dir, exist_ok=True)
+        if read_slice is None:
+            reads = multi_f5.get_reads()
+        else:
+            reads = (multi_f5.get_read(read_id) for read_id in multi_f5.get_read_ids()[read_slice])
+        for read in reads:
             try:
-                output_file = os.path.join(output_folder, subfolder, "{}.fast5".format(read.read_id))
-                create_single_f5(output_file, read)
+                output_file = os.path.join(output_dir, "{}.fast5".format(read.read_id))
+                create_single_f5(output_file, read, external_links)
                 output_files.append(os.path.basename(output_file))
             except Exception as e:
                 logger.error("{}\n\tFailed to copy read '{}' from {}"
@@ -69,20 +89,25 @@ def try_multi_to_single_conversion(input_file, output_folder, subfolder):
     return output_files
 
 
-def create_single_f5(output_file, read):
-    if not os.path.exists(os.path.dirname(output_file)):
-        os.makedirs(os.path.dirname(output_file))
+def create_single_f5(output_file, read, external_links=False):
+    # With external_links the output only contains links to the groups in the input file rather than a copy of them,
+    # so the input file must be kept (at the same absolute path) for the output to remain readable
+    # NB: the output directory must already exist
+    source_file = os.path.abspath(read.filename)
     with EmptyFast5(output_file, 'w') as single_f5:
-        for group in read.handle:
-            if group == "Raw":
-                read_number = read.handle["Raw"].attrs["read_number"]
-                single_f5.handle.copy(read.handle[group], "Raw/Reads/Read_{}".format(read_number))
-            elif group in ("channel_id", "context_tags", "tracking_id"):
-                if "UniqueGlobalKey" not in single_f5.handle:
-                    single_f5.handle.create_group("UniqueGlobalKey")
-                single_f5.handle.copy(read.handle[group], "UniqueGlobalKey/{}".format(group))
+        # h5py creates any missing intermediate groups (e.g. 'UniqueGlobalKey') on copy or link
+        for group_name, group in read.handle.items():
+            if group_name == "Raw":
+                read_number = group.attrs["read_number"]
+                output_path = "Raw/Reads/Read_{}".format(read_number)
+            elif group_name in ("channel_id", "context_tags", "tracking_id"):
+                output_path = "UniqueGlobalKey/{}".format(group_name)
+            else:
+                output_path = group_name
+            if external_links:
+                single_f5.handle[output_path] = h5py.ExternalLink(source_file, group.name)
             else:
-                single_f5.handle.copy(read.handle[group], group)
+                single_f5.handle.copy(group, output_path)
 
 
 def main():
@@ -97,11 +122,15 @@ def main():
                         help="Ignore symlinks when searching recursively for fast5 files")
     parser.add_argument('-t', '--threads', type=int, default=1, required=False,
                         help="Number of threads to use")
+    parser.add_argument('--external_links', action='store_true',
+                        help="Link to the reads in the MultiRead files instead of copying them. "
+                             "The output is only readable while the input files remain in place")
     parser.add_argument('-v', '--version', action='version', version=__version__)
     args = parser.parse_args()
 
     batch_convert_multi_files_to_single(args.input_path, args.save_path, args.threads,
-                                        args.recursive, follow_symlinks=not args.ignore_symlinks)
+                                        args.recursive, follow_symlinks=not args.ignore_symlinks,
+                                        external_links=args.external_links)
 
 
 if __name__ == '__main__':
@@ -4,8 +4,9 @@ from argparse import ArgumentParser
 from multiprocessing import Pool
 
 from ont_fast5_api import __version__
-from ont_fast5_api.compression_settings import COMPRESSION_MAP
-from ont_fast5_api.conversion_tools.conversion_utils import get_fast5_file_list, batcher, get_progress_bar
+from ont_fast5_api.compression_settings import COMPRESSION_MAP, COMPRESSION_CHOICES
+from ont_fast5_api.conversion_tools.conversion_utils import get_fast5_file_list, batcher, get_progress_bar, \
+    CHUNK_CACHE_SETTINGS, INPUT_FILE_SETTINGS
 from ont_fast5_api.fast5_file import Fast5File, Fast5FileTypeError
 from ont_fast5_api.multi_fast5 import MultiFast5File
 
@@ -16,28 +17,38 @@ exc_info = False
 
 def batch_convert_single_to_multi(input_path, output_folder, filename_base, batch_size,
                                   threads, recursive, follow_symlinks, target_compression):
-    pool = Pool(threads)
     file_list = get_fast5_file_list(input_path, recursive, follow_symlinks)
     pbar = get_progress_bar(int((len(file_list) + batch_size - 1) / batch_size))
 
-    def update(result):
-        output_file = result[1]
-        with open(os.path.join(output_folder, "filename_mapping.txt"), 'a') as output_table:
-            for filename in result[0]:
-                output_table.write("{}\t{}\n".format(filename, output_file))
-        pbar.update(pbar.currval + 1)
-
-    results_array = []
     os.makedirs(output_folder, exist_ok=True)
-    for batch_num, batch in enumerate(batcher(file_list, batch_size)):
-        output_file = os.path.join(output_folder, "{}_{}.fast5".format(filename_base, batch_num))
-        results_array.append(pool.apply_async(create_multi_read_file,
-                                              args=(batch, output_file, target_compression),
-                                              callback=update))
 
-    pool.close()
-    pool.join()
-    pbar.finish()
+    def task_args():
+        for batch_num, batch in enumerate(batcher(file_list, batch_size)):
+            output_file = os.path.join(output_folder, "{}_{}.fast5".format(filename_base, batch_num))
+            yield batch, output_file, target_compression
+
+    # Results are consumed here as they complete, so the mapping file is only ever written from this thread
+    # A failing task is re-raised from imap_unordered, the pool is then terminated on leaving the with block
+    try:
+        with Pool(threads) as pool:
+            with open(os.path.join(output_folder, "filename_mapping.txt"), 'a') as output_table:
+                for input_files, output_file in pool.imap_unordered(_create_multi_read_file_from_args, task_args()):
+                    output_table.write("".join("{}\t{}\n".format(filename, output_file) for filename in input_files))
+                    pbar.update(pbar.currval + 1)
+
+            pool.close()
+            pool.join()
+    finally:
+        pbar.finish()
+
+
+def _create_multi_read_file_from_args(args):
+    input_files, output_file, target_compression = args
+    try:
+        return create_multi_read_file(input_files, output_file, target_compression)
+    except Fast5FileTypeError:
+        # Already logged by create_multi_read_file, don't abort the other batches
+        return [], output_file
 
 
 def create_multi_read_file(input_files, output_file, target_compression):
@@ -46,10 +57,10 @@ def create_multi_read_file(input_files, output_file, target_compression):
     if os.path.exists(output_file):
         logger.info("FileExists - appending new reads to existing file: {}".format(output_file))
     try:
-        with MultiFast5File(output_file, 'a') as multi_f5:
+        with MultiFast5File(output_file, 'a', **CHUNK_CACHE_SETTINGS) as multi_f5:
             for filename in input_files:
                 try:
-                    with Fast5File(filename, 'r') as f5_input:
+                    with Fast5File(filename, 'r', **INPUT_FILE_SETTINGS) as f5_input:
                         read = f5_input.get_read(f5_input.read_id)
                         multi_f5.add_existing_read(read, target_compression=target_compression)
                     results.append(os.path.basename(filename))
@@ -86,7 +97,7 @@ def main():
     parser.add_argument('--ignore_symlinks', action='store_true',
                         help="Ignore symlinks when searching recursively for fast5 files")
     parser.add_argument('-c', '--compression', required=False, default=None,
-                        choices=list(COMPRESSION_MAP.keys()) + [None], help="Target output compression type")
+                        choices=COMPRESSION_CHOICES, help="Target output compression type")
     parser.add_argument('-v', '--version', action='version', version=__version__)
     args = parser.parse_args()
 
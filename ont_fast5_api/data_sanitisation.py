@@ -1,15 +1,43 @@
+from functools import lru_cache
+
 import h5py
 import numpy as np
 
 
 def _clean(value):
     """ Convert numpy numeric types to their python equivalents. """
+    # Attribute values are almost always one of a handful of exact types, so look up a handler for those directly
+    cleaner = _CLEANERS.get(type(value))
+    if cleaner is not None:
+        return cleaner(value)
+    return _clean_other(value)
+
+
+def _decode_array(data):
+    """ Decode a byte-string array to unicode, taking numpy's ASCII cast when possible.
+
+    The result is as wide as its longest string, the same as np.char.decode, rather than the width of the input.
+    """
+    # For ASCII data the byte length is the character length
+    width = max(1, int(np.char.str_len(data).max())) if data.size else 1
+    try:
+        # The ASCII cast runs in C, np.char.decode calls bytes.decode for every element
+        return data.astype('<U{}'.format(width))
+    except UnicodeDecodeError:
+        return np.char.decode(data)
+
+
+def _clean_ndarray(value):
+    if value.dtype.kind == 'S':
+        return _decode_array(value).tolist()
+    else:
+        return value.tolist()
+
+
+def _clean_other(value):
     if isinstance(value, np.ndarray):
-        if value.dtype.kind == 'S':
-            return np.char.decode(value).tolist()
-        else:
-            return value.tolist()
-    elif type(value).__module__ == np.__name__:
+        return _clean_ndarray(value)
+    elif isinstance(value, np.generic):
         # h5py==2.8.0 on windows sometimes fails to cast this from an np.float64 to a python.float
         # We have to let the user do this themselves, since casting here could be dangerous
         # https://github.com/h5py/h5py/issues/1051
@@ -23,24 +51,33 @@ def _clean(value):
         return value
 
 
+def _unchanged(value):
+    return value
+
+
+_CLEANERS = {str: _unchanged, int: _unchanged, float: _unchanged, bool: _unchanged, type(None): _unchanged,
+             bytes: bytes.decode, np.ndarray: _clean_ndarray}
+# numpy numeric scalars convert to python numbers with item(). Other numpy types (e.g. np.bytes_) use _clean_other
+for _numpy_type in (np.bool_, np.int8, np.int16, np.int32, np.int64, np.uint8, np.uint16, np.uint32, np.uint64,
+                    np.float16, np.float32, np.float64):
+    _CLEANERS[_numpy_type] = _numpy_type.item
+
+
 def _sanitize_data_for_writing(data):
     # To make the interface more user friendly we encode python strings as  byte-strings when writing datasets
-    if isinstance(data, str):
+    if isinstance(data, np.ndarray) and data.dtype.kind in 'biufc':
+        # Numeric arrays (e.g. raw signal) never need encoding
+        return data
+    elif isinstance(data, str):
         # Plain python-strings can be encoded trivially
         return data.encode()
-    elif isinstance(data, np.ndarray) and data.dtype.kind == np.dtype(np.unicode_):
+    elif isinstance(data, np.ndarray) and data.dtype.kind == 'U':
         # If the array is all of one type, unicode-string, we can encode with numpy
         return data.astype('S')
     elif isinstance(data, np.ndarray) and len(data.dtype) > 1:
         # If the array is of mixed types we have to set the encoding column by column
-        encoded_dtypes = []
-        for field_name in data.dtype.names:
-            field_dtype, field_byte_index = data.dtype.fields[field_name]
-            if field_dtype.kind == 'U':
-                str_len = field_dtype.itemsize // field_dtype.alignment
-                field_dtype = np.dtype("|S{}".format(str_len))
-            encoded_dtypes.append((field_name, field_dtype))
-        return data.astype(encoded_dtypes)
+        # NB: this is always a copy, even when no field needs encoding, so callers never get the input array back
+        return data.astype(_encoded_dtype(data.dtype))
 
     return data
 
@@ -50,20 +87,50 @@ def _sanitize_data_for_reading(data):
     if isinstance(data, h5py.Dataset):
         data = data[()]
 
-    if isinstance(data, bytes):
+    if isinstance(data, np.ndarray) and data.dtype.kind in 'biufc':
+        # Numeric arrays (e.g. raw signal) never need decoding
+        return data
+    elif isinstance(data, bytes):
         # Plain byte-strings can be decoded trivially
         return data.decode()
     elif isinstance(data, np.ndarray) and data.dtype.kind == 'S':
         # If the array is all of one type, byte-string, we can decode with numpy
-        return np.char.decode(data)
+        return _decode_array(data)
     elif isinstance(data, np.ndarray) and len(data.dtype) > 1:
         # If the array is of mixed types we have to decode column by column
-        decoded_dtypes = []
-        for field_name in data.dtype.names:
-            field_dtype, field_byte_index = data.dtype.fields[field_name]
-            if field_dtype.kind == 'S':
-                field_dtype = np.dtype("<U{}".format(field_dtype.itemsize))
-            decoded_dtypes.append((field_name, field_dtype))
-        return data.astype(decoded_dtypes)
+        # NB: this is always a copy, even when no field needs decoding, so callers never get the input array back
+        return data.astype(_decoded_dtype(data.dtype))
 
     return data
+
+
+# Compound datasets (e.g. event tables) are read and written many times with the same few dtypes,
+# so the field-by-field conversion of each dtype is cached
+@lru_cache(maxsize=128)
+def _encoded_dtype(dtype):
+    if not any(dtype.fields[field_name][0].kind == 'U' for field_name in dtype.names):
+        # Nothing to encode, so keep the dtype (and its field layout) as it is
+        return dtype
+    encoded_dtypes = []
+    for field_name in dtype.names:
+        field_dtype, field_byte_index = dtype.fields[field_name]
+        if field_dtype.kind == 'U':
+            # numpy stores unicode strings as 4 bytes per character
+            str_len = field_dtype.itemsize // 4
+            field_dtype = np.dtype("|S{}".format(str_len))
+        encoded_dtypes.append((field_name, field_dtype))
+    return np.dtype(encoded_dtypes)
+
+
+@lru_cache(maxsize=128)
+def _decoded_dtype(dtype):
+    if not any(dtype.fields[field_name][0].kind == 'S' for field_name in dtype.names):
+        # Nothing to decode, so keep the dtype (and its field layout) as it is
+        return dtype
+    decoded_dtypes = []
+    for field_name in dtype.names:
+        field_dtype, field_byte_index = dtype.fields[field_name]
+        if field_dtype.kind == 'S':
+            field_dtype = np.dtype("<U{}".format(field_dtype.itemsize))
+        decoded_dtypes.append((field_name, field_dtype))
+    return np.dtype(decoded_dtypes)
@@ -1,12 +1,13 @@
 """ Basic API for reading/writing single-read fast5 files.
 """
 import os
+import warnings
 import h5py
 import numpy as np
 
 from ont_fast5_api import CURRENT_FAST5_VERSION
 from ont_fast5_api.compression_settings import VBZ, raise_missing_vbz_error_read
-from ont_fast5_api.fast5_read import Fast5Read
+from ont_fast5_api.fast5_read import Fast5Read, copy_attributes, signal_chunk_shape
 from ont_fast5_api.fast5_info import Fast5Info, ReadInfo
 from ont_fast5_api.static_data import supported_modes, mode_docstring
 
@@ -26,12 +27,18 @@ class Fast5File(Fast5Read):
     The object will contain a field called **status** that is a
     Fast5Status object with details about the file.
     """
+    # The first read's id and number are looked up on almost every call, so they are cached from the status
+    _cached_read_id = None
+    _cached_read_number = None
+    _global_group_handle = None
 
-    def __init__(self, fname, mode='r'):
+    def __init__(self, fname, mode='r', **kwargs):
         """ Constructor. Opens the specified file.
 
         :param fname: Filename to open.
         :param mode: File open mode (r, r+, w, w-, x, a).
+        :param kwargs: Additional keyword arguments passed on to h5py.File
+            (e.g. chunk cache settings rdcc_nbytes/rdcc_nslots).
         """
         self.global_key = "UniqueGlobalKey/"
         if mode not in supported_modes:
@@ -39,38 +46,51 @@ class Fast5File(Fast5Read):
         self.filename = fname
         self.handle = None
         self.mode = mode
+        self._h5py_kwargs = kwargs
         self._initialise_file()
 
     def get_reads(self):
         # We yield here for consistency with MultiFast5File
-        yield self.get_read(self.get_read_id())
+        yield self.get_read(self.read_id)
 
     def get_read_ids(self):
-        return [self.get_read_id()]
+        return [self.read_id]
 
     def get_read(self, read_id):
-        if read_id != self.get_read_id():
+        if read_id != self.read_id:
             raise KeyError("read_id given: {} does not match read_id in file: {}"
-                           "".format(read_id, self.get_read_id()))
+                           "".format(read_id, self.read_id))
         return self
 
     @property
     def read_id(self):
-        return self.status.read_info[0].read_id
+        if self._cached_read_id is None:
+            self._cached_read_id = self.status.read_info[0].read_id
+        return self._cached_read_id
 
     def get_read_id(self):
-        DeprecationWarning("'read.get_read_id()' will be deprecated. Use the property 'read.read_id' instead")
+        warnings.warn("'read.get_read_id()' will be deprecated. Use the property 'read.read_id' instead",
+                      DeprecationWarning, stacklevel=2)
         return self.read_id
 
+    @property
+    def _global_group(self):
+        # Keep the 'UniqueGlobalKey' group open, so its subgroups are found without resolving it from the root each time
+        if self._global_group_handle is None:
+            self._global_group_handle = self.handle[self.global_key[:-1]]
+        return self._global_group_handle
+
+    def close(self):
+        """ Closes the object.
+        """
+        self._global_group_handle = None
+        super().close()
+
     @property
     def raw_dataset_group_name(self):
         read_number = self._get_only_read_number()
         return 'Raw/Reads/Read_{}'.format(read_number)
 
-    @property
-    def has_context_tags(self):
-        return 'context_tags' in self.handle[self.global_key[:-1]]
-
     def add_channel_info(self, data, clear=False):
         """ Add channel info data to the channel_id group.
 
@@ -80,6 +100,7 @@ class Fast5File(Fast5Read):
         """
         self.assert_writeable()
         self._add_attributes(self.global_key + 'channel_id', data, clear)
+        self._raw_scaling = None
 
     def get_raw_data(self, read_number=None, start=None, end=None, scale=False):
         """ Pull raw data from the file.
@@ -96,10 +117,33 @@ class Fast5File(Fast5Read):
         :returns: Raw data as either 32 bit floats, or 16 bit integers.
         """
         self.assert_open()
-        if self.raw_dataset_name not in self.handle:
+        raw_dataset_name = self.raw_dataset_name
+        if raw_dataset_name not in self.handle:
             msg = 'Fast5 file has no raw data for read {} in {}'.format(read_number, self.filename)
             raise KeyError(msg)
-        return self._load_raw(self.raw_dataset_name, start, end, scale)
+        return self._load_raw(raw_dataset_name, start, end, scale)
+
+    def get_raw_data_multi(self, scale=False):
+        """ Pull the raw data for every read in the file.
+
+        :param scale: If set, the returned data will be scaled floating point
+            values, in pA. Otherwise raw DAQ values are returned as 16 bit
+            integers.
+        :returns: A dictionary of read number to raw data, for each read
+            which has raw data.
+        """
+        self.assert_open()
+        raw_data = {}
+        for read_info in self.status.read_info:
+            if read_info.has_raw_data:
+                read_group_name = 'Raw/Reads/Read_{}'.format(read_info.read_number)
+                # Legacy files may hold the signal in a 'Data' dataset instead, as accepted by Fast5Info
+                if 'Signal' in self.handle[read_group_name]:
+                    dataset_name = read_group_name + '/Signal'
+                else:
+                    dataset_name = read_group_name + '/Data'
+                raw_data[read_info.read_number] = self._load_raw(dataset_name, None, None, scale)
+        return raw_data
 
     def add_raw_data(self, data, attrs=None, compression=VBZ):
         """ Add raw data for a read.
@@ -121,7 +165,8 @@ class Fast5File(Fast5Read):
             self.handle.create_group(group_name)
 
         try:
-            self.handle[group_name].create_dataset('Signal', data=data, dtype='i2', **vars(compression))
+            self.handle[group_name].create_dataset('Signal', data=data, dtype='i2', chunks=signal_chunk_shape(data),
+                                                   **vars(compression))
         except ValueError as e:
             raise_missing_vbz_error_read(e)
 
@@ -150,6 +195,8 @@ class Fast5File(Fast5Read):
         n = len(self.status.read_info) - 1
         self.status.read_number_map[read_number] = n
         self.status.read_id_map[read_id] = n
+        self._cached_read_id = None
+        self._cached_read_number = None
         group_name = self.raw_dataset_group_name
         attrs = {'read_number': read_number,
                  'read_id': read_id,
@@ -178,15 +225,12 @@ class Fast5File(Fast5Read):
             # Add Raw/Read/Read_## groups for reads if they are missing.
             for read_info in status.read_info:
                 read_group_name = 'Raw/Reads/Read_{}'.format(read_info.read_number)
-                if read_group_name in handle:
-                    rgh = handle[read_group_name]
-                else:
-                    rgh = handle.create_group(read_group_name)
-                rgh.attrs['read_number'] = read_info.read_number
-                rgh.attrs['read_id'] = read_info.read_id
-                rgh.attrs['duration'] = read_info.duration
-                rgh.attrs['start_time'] = read_info.start_time
-                rgh.attrs['start_mux'] = read_info.start_mux
+                rgh = handle.require_group(read_group_name)
+                copy_attributes({'read_number': read_info.read_number,
+                                 'read_id': read_info.read_id,
+                                 'duration': read_info.duration,
+                                 'start_time': read_info.start_time,
+                                 'start_mux': read_info.start_mux}, rgh)
 
             # Add the Analyses and tracking_id groups, if they are missing.
             if not 'Analyses' in handle:
@@ -207,15 +251,17 @@ class Fast5File(Fast5Read):
                         if 'Events' in read_group:
                             dataset = read_group['Events']
                             if 'variance' in dataset.dtype.names:
-                                old_data = read_group['Events'][()]
+                                old_data = dataset[()]
                                 new_data = np.empty(old_data.size, dtype=[('mean', float), ('stdv', float),
                                                                           ('start', int), ('length', int)])
-                                new_data[:]['mean'] = old_data['mean']
-                                new_data[:]['stdv'] = np.sqrt(old_data['variance'])
-                                new_data[:]['start'] = old_data['start']
-                                new_data[:]['length'] = old_data['length']
+                                # Fill each field in place, rather than via temporary views and arrays
+                                new_data['mean'] = old_data['mean']
+                                np.sqrt(old_data['variance'], out=new_data['stdv'])
+                                new_data['start'] = old_data['start']
+                                new_data['length'] = old_data['length']
                                 del read_group['Events']
-                                read_group.create_dataset('Events', data=new_data, compression='gzip')
+                                # Byte-shuffling the fixed width event fields lets gzip compress them noticeably better
+                                read_group.create_dataset('Events', data=new_data, compression='gzip', shuffle=True)
 
             # Update the version number.
             handle.attrs['file_version'] = CURRENT_FAST5_VERSION
@@ -233,19 +279,13 @@ class Fast5File(Fast5Read):
         with Fast5File(fname, mode='r') as fh:
             summary['tracking_id'] = fh.get_tracking_id()
             summary['channel_id'] = fh.get_channel_info()
-            read_info = fh.status.read_info
-            read_summary = []
-            for read in read_info:
-                read_summary.append({'read_number': read.read_number,
-                                     'read_id': read.read_id,
-                                     'start_time': read.start_time,
-                                     'duration': read.duration,
-                                     'start_mux': read.start_mux})
-            summary['reads'] = read_summary
-            analyses_list = fh.list_analyses(component)
-            _, group_names = zip(*analyses_list)
-            group_names = sorted(group_names)
-            group = group_names[-1]
+            summary['reads'] = [{'read_number': read.read_number,
+                                 'read_id': read.read_id,
+                                 'start_time': read.start_time,
+                                 'duration': read.duration,
+                                 'start_mux': read.start_mux} for read in fh.status.read_info]
+            # The latest analysis of the component, i.e. the group name with the highest index
+            group = max(group_name for _, group_name in fh.list_analyses(component))
             summary['software'] = fh.get_analysis_attributes(group)
             summary['software']['component'] = group[:-4]
 
@@ -260,29 +300,38 @@ class Fast5File(Fast5Read):
     ##########################
 
     def _get_only_read_number(self):
-        read_number = self.status.read_info[0].read_number
-        return read_number
+        if self._cached_read_number is None:
+            self._cached_read_number = self.status.read_info[0].read_number
+        return self._cached_read_number
 
     def _initialise_file(self):
+        # The file is opened once and the same handle is used to read the status, rather than Fast5Info re-opening it
+        # 'a' must not create a missing file here (it isn't a valid fast5), so open it as 'r+' instead
+        open_mode = 'r+' if self.mode == 'a' else self.mode
+        handle = None
         try:
+            handle = h5py.File(self.filename, open_mode, **self._h5py_kwargs)
             if self.mode in ['w', 'w-', 'x']:
-                with h5py.File(self.filename, self.mode) as fh:
-                    fh.attrs['file_version'] = CURRENT_FAST5_VERSION
-                    fh.create_group('Analyses')
-                    fh.create_group('Raw/Reads')
-                    fh.create_group(self.global_key + 'channel_id')
-                    fh.create_group(self.global_key + 'context_tags')
-                    fh.create_group(self.global_key + 'tracking_id')
+                handle.attrs['file_version'] = CURRENT_FAST5_VERSION
+                handle.create_group('Analyses')
+                handle.create_group('Raw/Reads')
+                handle.create_group(self.global_key + 'channel_id')
+                handle.create_group(self.global_key + 'context_tags')
+                handle.create_group(self.global_key + 'tracking_id')
                 self.mode = 'r+'
-            self.status = Fast5Info(self.filename)
+            self.status = Fast5Info(self.filename, handle=handle)
             if self.status.valid:
-                self.handle = h5py.File(self.filename, self.mode)
+                self.handle = handle
+            else:
+                handle.close()
         except Exception:
+            if handle is not None:
+                handle.close()
             raise Fast5FileTypeError("Failed to initialise single-read Fast5File: '{}'".format(self.filename))
 
 
 class EmptyFast5(Fast5File):
     def _initialise_file(self):
         # Enable creation of Fast5File without metadata, which we will populate later
-        self.handle = h5py.File(self.filename, self.mode)
+        self.handle = h5py.File(self.filename, self.mode, **self._h5py_kwargs)
         self.handle.attrs['file_version'] = CURRENT_FAST5_VERSION
@@ -1,6 +1,8 @@
 """ Helper class for getting information about a fast5 file.
 """
 import os
+from functools import lru_cache
+
 import h5py
 
 from packaging import version as packaging_version
@@ -8,6 +10,16 @@ from packaging import version as packaging_version
 # This unused import is included for backwards compatibilty and can be removed in future.
 from ont_fast5_api.data_sanitisation import _clean
 
+MINIMUM_VALID_VERSION = packaging_version.Version('0.6')
+LEGACY_CUTOFF_VERSION = packaging_version.Version('1.1')
+
+
+@lru_cache(maxsize=None)
+def _parse_version(version):
+    # Only a handful of distinct file_version values exist, so parse each of them once
+    return packaging_version.parse(str(version))
+
+
 class ReadInfo(object):
     """ This object provides basic details about a read.
     """
@@ -48,10 +60,12 @@ class Fast5Info(object):
         list for each read-id.
     """
 
-    def __init__(self, fname):
+    def __init__(self, fname, handle=None):
         """ Constructs a status object from a file.
 
         :param fname: Filename of fast5 file to read status from.
+        :param handle: Optional h5py.File already open on fname. If given,
+            it is read from instead of opening the file again.
         """
         self.valid = True
         self.channel = None
@@ -59,107 +73,11 @@ class Fast5Info(object):
         self.read_number_map = {}
         self.read_id_map = {}
         try:
-            with h5py.File(fname, 'r') as handle:
-                if 'file_version' in handle.attrs:
-                    self.version = _clean(handle.attrs['file_version'])
-                    minimum_valid_version = packaging_version.Version('0.6')
-                    if packaging_version.parse(str(self.version)) \
-                       < minimum_valid_version:
-                        self.valid = False
-                else:
-                    self.valid = False
-                    self.version = 0.0
-
-                # Check for required groups.
-                top_groups = handle.keys()
-                if 'UniqueGlobalKey' in top_groups:
-                    global_keys = handle['UniqueGlobalKey'].keys()
-                if 'tracking_id' not in global_keys and not self._legacy_version():
-                    self.valid = False
-                if 'channel_id' not in global_keys:
-                    self.valid = False
-
-                self.channel = handle['UniqueGlobalKey/channel_id'].attrs.get('channel_number')
-                if self.channel is None and self._legacy_version():
-                    self.valid = False
-
-                # Get the read information.
-                if 'Raw' in top_groups:
-                    reads = handle['Raw/Reads'].keys()
-                    for read in reads:
-                        read_group_name = 'Raw/Reads/{}'.format(read)
-                        read_group = handle[read_group_name]
-                        read_attrs = read_group.attrs
-                        read_number = _clean(read_attrs['read_number'])
-                        if 'read_id' in read_attrs:
-                            read_id = _clean(read_attrs['read_id'])
-                        else:
-                            if not self._legacy_version():
-                                self.valid = False
-                            else:
-                                read_id = os.path.basename(fname)
-                        start_time = _clean(read_attrs['start_time'])
-                        duration = _clean(read_attrs['duration'])
-                        mux = _clean(read_attrs.get('start_mux',0))
-                        median_before = _clean(read_attrs.get('median_before',-1.0))
-                        read_info = ReadInfo(read_number, read_id, start_time, duration, mux, median_before)
-                        if 'Signal' in read_group:
-                            read_info.has_raw_data = True
-                        elif self._legacy_version():
-                            if 'Data' in read_group:
-                                read_info.has_raw_data = True
-                            else:
-                                self.valid = False
-                        self.read_info.append(read_info)
-                        n = len(self.read_info) - 1
-                        self.read_number_map[read_number] = n
-                        self.read_id_map[read_id] = n
-                else:
-                    if not self._legacy_version():
-                        self.valid = False
-                analyses = sorted(handle['Analyses'].keys()) if 'Analyses' in handle else []
-                for ana in analyses[::-1]:
-                    if ana.startswith('EventDetection'):
-                        reads_group_name = 'Analyses/{}/Reads'.format(ana)
-                        if reads_group_name not in handle:
-                            continue
-                        reads = handle[reads_group_name].keys()
-                        for read in reads:
-                            read_group_name = '{}/{}'.format(reads_group_name, read)
-                            read_group = handle[read_group_name]
-                            read_attrs = read_group.attrs
-                            read_number = _clean(read_attrs['read_number'])
-                            if 'read_id' in read_attrs:
-                                read_id = _clean(read_attrs['read_id'])
-                            else:
-                                if not self._legacy_version():
-                                    self.valid = False
-                                    continue
-                                else:
-                                    read_id = os.path.basename(fname)
-                            start_time = _clean(read_attrs['start_time'])
-                            duration = _clean(read_attrs['duration'])
-                            mux = _clean(read_attrs.get('start_mux', 0))
-                            median_before = _clean(read_attrs.get('median_before', -1.0))
-                            read_info = ReadInfo(read_number, read_id, start_time, duration, mux, median_before)
-                            if 'Events' in read_group:
-                                read_info.has_event_data = True
-                                read_info.event_data_count = len(read_group['Events'])
-                            else:
-                                read_info.has_event_data = False
-                                read_info.event_data_count = 0
-                            if read_number in self.read_number_map:
-                                read_index = self.read_number_map[read_number]
-                                self.read_info[read_index].has_event_data = read_info.has_event_data
-                                self.read_info[read_index].event_data_count = read_info.event_data_count
-                            else:
-                                if not self._legacy_version():
-                                    self.valid = False
-                                self.read_info.append(read_info)
-                                n = len(self.read_info) - 1
-                                self.read_number_map[read_number] = n
-                                self.read_id_map[read_id] = n
-                        break
+            if handle is None:
+                with h5py.File(fname, 'r') as handle:
+                    self._read_status(fname, handle)
+            else:
+                self._read_status(fname, handle)
         except:
             self.valid = False
             raise
@@ -169,6 +87,107 @@ class Fast5Info(object):
             if len(self.read_info) == 0:
                 self.valid = False
 
+    def _read_status(self, fname, handle):
+        if 'file_version' in handle.attrs:
+            self.version = _clean(handle.attrs['file_version'])
+            if _parse_version(self.version) < MINIMUM_VALID_VERSION:
+                self.valid = False
+        else:
+            self.valid = False
+            self.version = 0.0
+
+        # Check for required groups.
+        top_groups = handle.keys()
+        if 'UniqueGlobalKey' in top_groups:
+            global_keys = handle['UniqueGlobalKey'].keys()
+        if 'tracking_id' not in global_keys and not self._legacy_version():
+            self.valid = False
+        if 'channel_id' not in global_keys:
+            self.valid = False
+
+        self.channel = handle['UniqueGlobalKey/channel_id'].attrs.get('channel_number')
+        if self.channel is None and self._legacy_version():
+            self.valid = False
+
+        # Get the read information.
+        if 'Raw' in top_groups:
+            # Look the read groups up relative to their parent, rather than resolving each full path from the root
+            raw_reads = handle['Raw/Reads']
+            for read in raw_reads:
+                read_group = raw_reads[read]
+                read_attrs = read_group.attrs
+                read_number = _clean(read_attrs['read_number'])
+                # A single get() rather than a membership test followed by a read
+                read_id = read_attrs.get('read_id')
+                if read_id is not None:
+                    read_id = _clean(read_id)
+                else:
+                    if not self._legacy_version():
+                        self.valid = False
+                    else:
+                        read_id = os.path.basename(fname)
+                start_time = _clean(read_attrs['start_time'])
+                duration = _clean(read_attrs['duration'])
+                mux = _clean(read_attrs.get('start_mux',0))
+                median_before = _clean(read_attrs.get('median_before',-1.0))
+                read_info = ReadInfo(read_number, read_id, start_time, duration, mux, median_before)
+                if 'Signal' in read_group:
+                    read_info.has_raw_data = True
+                elif self._legacy_version():
+                    if 'Data' in read_group:
+                        read_info.has_raw_data = True
+                    else:
+                        self.valid = False
+                self.read_info.append(read_info)
+                n = len(self.read_info) - 1
+                self.read_number_map[read_number] = n
+                self.read_id_map[read_id] = n
+        else:
+            if not self._legacy_version():
+                self.valid = False
+        analyses_group = handle.get('Analyses')
+        analyses = sorted(analyses_group.keys()) if analyses_group is not None else []
+        for ana in analyses[::-1]:
+            if ana.startswith('EventDetection'):
+                reads_group = analyses_group.get('{}/Reads'.format(ana))
+                if reads_group is None:
+                    continue
+                for read in reads_group:
+                    read_group = reads_group[read]
+                    read_attrs = read_group.attrs
+                    read_number = _clean(read_attrs['read_number'])
+                    read_id = read_attrs.get('read_id')
+                    if read_id is not None:
+                        read_id = _clean(read_id)
+                    else:
+                        if not self._legacy_version():
+                            self.valid = False
+                            continue
+                        else:
+                            read_id = os.path.basename(fname)
+                    start_time = _clean(read_attrs['start_time'])
+                    duration = _clean(read_attrs['duration'])
+                    mux = _clean(read_attrs.get('start_mux', 0))
+                    median_before = _clean(read_attrs.get('median_before', -1.0))
+                    read_info = ReadInfo(read_number, read_id, start_time, duration, mux, median_before)
+                    if 'Events' in read_group:
+                        read_info.has_event_data = True
+                        read_info.event_data_count = len(read_group['Events'])
+                    else:
+                        read_info.has_event_data = False
+                        read_info.event_data_count = 0
+                    if read_number in self.read_number_map:
+                        read_index = self.read_number_map[read_number]
+                        self.read_info[read_index].has_event_data = read_info.has_event_data
+                        self.read_info[read_index].event_data_count = read_info.event_data_count
+                    else:
+                        if not self._legacy_version():
+                            self.valid = False
+                        self.read_info.append(read_info)
+                        n = len(self.read_info) - 1
+                        self.read_number_map[read_number] = n
+                        self.read_id_map[read_id] = n
+                break
+
     def _legacy_version(self):
-        legacy_cutoff = packaging_version.Version("1.1")
-        return packaging_version.parse(str(self.version)) < legacy_cutoff
+        return _parse_version(self.version) < LEGACY_CUTOFF_VERSION
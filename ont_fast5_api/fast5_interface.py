@@ -8,11 +8,12 @@ SINGLE_READ = "single-read"
 BULK_FAST5 = "bulk"
 
 
-def get_fast5_file(filepath, mode='r', driver=None):
+def get_fast5_file(filepath, mode='r', driver=None, **kwargs):
+    # Any further kwargs (e.g. chunk cache settings) are passed on to h5py.File
     if is_multi_read(filepath):
-        return MultiFast5File(filepath, mode, driver=driver)
+        return MultiFast5File(filepath, mode, driver=driver, **kwargs)
     else:
-        return Fast5File(filepath, mode)
+        return Fast5File(filepath, mode, **kwargs)
 
 
 def check_file_type(f5_file):
@@ -4,12 +4,16 @@ from typing import Dict, Any, Union
 import h5py
 import numpy as np
 import warnings
-from collections import deque
 
 from ont_fast5_api.compression_settings import VBZ, raise_missing_vbz_error_read, raise_missing_vbz_error_write
 from ont_fast5_api.data_sanitisation import _sanitize_data_for_reading, _sanitize_data_for_writing, _clean
 from ont_fast5_api.static_data import LEGACY_COMPONENT_NAMES
 
+# Raw signals are written in chunks of up to this many samples (32KiB). h5py's automatic chunking picks a few
+# thousand samples, which makes whole-signal reads of long reads decompress many small chunks. Chunks much larger
+# than this would make get_raw_data(start=, end=) decompress far more signal than it returns
+SIGNAL_CHUNK_SIZE = 16384
+
 
 class AbstractFast5:
     def __enter__(self):
@@ -55,6 +59,7 @@ class AbstractFast5:
 
 class Fast5Read(AbstractFast5):
     global_key = "" # This is for single Fast5File compatibility
+    _raw_scaling = None  # (offset, scaling) from channel_id, loaded on the first scaled raw read
 
     def __init__(self, parent, read_id):
         self.parent = parent
@@ -65,11 +70,13 @@ class Fast5Read(AbstractFast5):
 
 
     def get_run_id(self):
-        DeprecationWarning("'read.get_run_id()' will be deprecated. Use the property 'read.run_id' instead")
+        warnings.warn("'read.get_run_id()' will be deprecated. Use the property 'read.run_id' instead",
+                      DeprecationWarning, stacklevel=2)
         return self.run_id
 
     def get_read_id(self):
-        DeprecationWarning("'read.get_read_id()' will be deprecated. Use the property 'read.read_id' instead")
+        warnings.warn("'read.get_read_id()' will be deprecated. Use the property 'read.read_id' instead",
+                      DeprecationWarning, stacklevel=2)
         return self.read_id
 
     @property
@@ -84,9 +91,14 @@ class Fast5Read(AbstractFast5):
     def raw_compression_filters(self):
         return self.handle[self.raw_dataset_name]._filters
 
+    @property
+    def _global_group(self):
+        # The group holding tracking_id and channel_id. In a multi-read file these sit directly in the read group
+        return self.handle
+
     @property
     def run_id(self):
-        return self.handle[self.global_key + 'tracking_id'].attrs['run_id']
+        return self._global_group['tracking_id'].attrs['run_id']
 
     def add_raw_data(self, data, attrs=None, compression=VBZ):
         """ Add raw data for a read.
@@ -104,6 +116,7 @@ class Fast5Read(AbstractFast5):
             raise KeyError(msg.format(self.read_id, self.filename))
         try:
             self.handle[self.raw_dataset_group_name].create_dataset('Signal', data=data, dtype='i2',
+                                                                    chunks=signal_chunk_shape(data),
                                                                     **vars(compression))
         except ValueError as e:
             raise_missing_vbz_error_read(e)
@@ -122,6 +135,7 @@ class Fast5Read(AbstractFast5):
         if 'channel_id' not in self.handle:
             self.handle.create_group('channel_id')
         self._add_attributes('channel_id', attrs, clear)
+        self._raw_scaling = None
 
     def add_tracking_id(self, attrs, clear=False):
         self.assert_writeable()
@@ -169,18 +183,17 @@ class Fast5Read(AbstractFast5):
         """
         self.assert_open()
         analyses = []
-        if 'Analyses' not in self.handle:
+        ana_groups = self.handle.get('Analyses')
+        if ana_groups is None:
             return analyses
-        ana_groups = self.handle['Analyses'].keys()
-        for group_name in ana_groups:
-            group_attrs = self.handle['Analyses/{}'.format(group_name)].attrs
-            if 'component' in group_attrs:
-                comp = _clean(group_attrs['component'])
-            elif group_name[:-4] in LEGACY_COMPONENT_NAMES:
-                comp = LEGACY_COMPONENT_NAMES[group_name[:-4]]
+        for group_name, group in ana_groups.items():
+            # A single attribute lookup, rather than a membership test followed by a read
+            comp = group.attrs.get('component')
+            if comp is not None:
+                comp = _clean(comp)
             else:
-                # We don't know anything about this component!
-                comp = None
+                # Fall back on the legacy names, or None if we don't know anything about this component!
+                comp = LEGACY_COMPONENT_NAMES.get(group_name[:-4])
             if comp is not None and (component is None or comp == component):
                 analyses.append((comp, group_name))
         return analyses
@@ -199,17 +212,20 @@ class Fast5Read(AbstractFast5):
             there are no analyses with the specified base name.
         """
         self.assert_open()
-        all_analyses = self.list_analyses()
+        analyses = self.handle.get('Analyses')
         selected = []
-        for analysis in all_analyses:
-            if analysis[1][:-4] == group_base:
-                selected.append(analysis[1])
+        if analyses is not None:
+            # Filter on the name first, so only matching groups need their component attribute checked
+            for group_name in analyses:
+                if group_name[:-4] == group_base and \
+                        (group_base in LEGACY_COMPONENT_NAMES or 'component' in analyses[group_name].attrs):
+                    selected.append(group_name)
         if len(selected) == 0:
             result = None
             if increment:
                 result = '{}_000'.format(group_base)
             return result
-        result = sorted(selected)[-1]
+        result = max(selected)
         if increment:
             count = int(result[-3:]) + 1
             result = '{}_{}'.format(group_base, str(count).zfill(3))
@@ -257,21 +273,20 @@ class Fast5Read(AbstractFast5):
             component = attr['component']
         else:
             component = LEGACY_COMPONENT_NAMES[group_name[:-4]]
-        chain = deque()
-        chain.append((component, group_name))
-        groups_to_check = deque()
-        groups_to_check.append(endgroup)
-        while len(groups_to_check) > 0:
-            group = groups_to_check.popleft()
+        # An insertion-ordered dict, so that entries can be found and moved in constant time
+        chain = {(component, group_name): None}
+        # Groups are visited in the order they're found. Iterating a list also visits the items appended during the loop
+        groups_to_check = [endgroup]
+        for group in groups_to_check:
             attr = self.handle[group].attrs
             for key, value in attr.items():
-                if str(value).startswith('Analyses/'):
+                # Links to other groups are stored as strings, so there's no need to convert other values to check them
+                if isinstance(value, str) and value.startswith('Analyses/'):
                     chain_entry = (key, value[9:])
                     # We need to maintain the order of the components, so
                     # we'll move any we see again to the end of the chain.
-                    if chain_entry in chain:
-                        chain.remove(chain_entry)
-                    chain.append(chain_entry)
+                    chain.pop(chain_entry, None)
+                    chain[chain_entry] = None
                     groups_to_check.append(value)
         return list(chain)
 
@@ -279,7 +294,7 @@ class Fast5Read(AbstractFast5):
         """ Returns a dictionary of tracking-id key/value pairs.
         """
         self.assert_open()
-        tracking = self.handle[self.global_key + 'tracking_id'].attrs.items()
+        tracking = self._global_group['tracking_id'].attrs.items()
         tracking = {key: _clean(value) for key, value in tracking}
         return tracking
 
@@ -298,22 +313,23 @@ class Fast5Read(AbstractFast5):
         """ Returns a dictionary of channel information key/value pairs.
         """
         self.assert_open()
-        channel_info = self.handle[self.global_key + 'channel_id'].attrs.items()
+        channel_info = self._global_group['channel_id'].attrs.items()
         channel_info = {key: _clean(value) for key, value in channel_info}
         channel_info['channel_number'] = int(channel_info['channel_number'])
         return channel_info
 
     @property
     def has_context_tags(self):
-        return 'context_tags' in self.handle
+        return self.global_key + 'context_tags' in self.handle
 
     def get_context_tags(self):
         """ Returns a dictionary of context tag key/value pairs.
         """
         self.assert_open()
-        if self.has_context_tags:
-            tags = self.handle[self.global_key + 'context_tags'].attrs.items()
-            return {key: _clean(value) for key, value in tags}
+        # A single get() rather than checking has_context_tags and then looking the group up again
+        context_tags = self.handle.get(self.global_key + 'context_tags')
+        if context_tags is not None:
+            return {key: _clean(value) for key, value in context_tags.attrs.items()}
         return {}
 
     def add_context_tags(self, data, clear=False):
@@ -396,9 +412,9 @@ class Fast5Read(AbstractFast5):
             configuration exists for the analysis.
         """
         self.assert_open()
-        group = 'Analyses/{}/Configuration'.format(group_name)
+        group = self.handle.get('Analyses/{}/Configuration'.format(group_name))
         config = None
-        if group in self.handle:
+        if group is not None:
             config = self._parse_attribute_tree(group)
         return config
 
@@ -412,9 +428,9 @@ class Fast5Read(AbstractFast5):
             that step.
         """
         self.assert_open()
-        group = 'Analyses/{}/Summary'.format(group_name)
+        group = self.handle.get('Analyses/{}/Summary'.format(group_name))
         summary = None
-        if group in self.handle:
+        if group is not None:
             summary = self._parse_attribute_tree(group)
         return summary
 
@@ -458,14 +474,13 @@ class Fast5Read(AbstractFast5):
         :returns: A dictionary representing the attributes (if any).
         """
         self.assert_open()
-        group = 'Analyses/{}'.format(group_name)
+        group = self.handle.get('Analyses/{}'.format(group_name))
         attr = None
-        if group in self.handle:
-            attr = self.handle[group].attrs.items()
-            attr = {key: _clean(value) for key, value in attr}
+        if group is not None:
+            attr = {key: _clean(value) for key, value in group.attrs.items()}
         return attr
 
-    def add_analysis_dataset(self, group_name, dataset_name, data, attrs=None):
+    def add_analysis_dataset(self, group_name, dataset_name, data, attrs=None, compression='gzip'):
         """ Add a dataset to the specified group.
 
         :param group_name: The path of the group the dataset will be added to,
@@ -473,6 +488,10 @@ class Fast5Read(AbstractFast5):
         :param dataset_name: The name of the new dataset.
         :param data: A numpy array representing the data to be written.
         :param attrs: A dictionary of attributes to be added to the dataset.
+        :param compression: The h5py compression filter for non-scalar data,
+            or None to write it uncompressed. 'lzf' is faster to read and
+            write, but can only be read back through h5py. Numeric data is
+            also byte-shuffled ahead of compression.
         :raises KeyError: If dataset is being added to non-existant group or
             if file is not open for writing.
         """
@@ -487,9 +506,13 @@ class Fast5Read(AbstractFast5):
             self.handle[group_path].create_dataset(dataset_name,
                                                    data=sanitized_data)
         else:
+            # Byte-shuffling fixed width numeric (and compound) data lets the compression filter work much better
+            shuffle = compression is not None and isinstance(sanitized_data, np.ndarray) \
+                and sanitized_data.dtype.kind in 'biufcV'
             self.handle[group_path].create_dataset(dataset_name,
                                                    data=sanitized_data,
-                                                   compression='gzip')
+                                                   compression=compression,
+                                                   shuffle=shuffle)
         if attrs is not None:
             path = '{}/{}'.format(group_path, dataset_name)
             self._add_attributes(path, attrs)
@@ -506,12 +529,9 @@ class Fast5Read(AbstractFast5):
             does not exist.
         """
         self.assert_open()
-        dataset_name = 'Analyses/{}/{}'.format(group_name, dataset_name)
-        data = None
-        if dataset_name in self.handle:
-            data = self.handle[dataset_name]
-            if not skip_decoding:
-                data = _sanitize_data_for_reading(data)
+        data = self.handle.get('Analyses/{}/{}'.format(group_name, dataset_name))
+        if data is not None and not skip_decoding:
+            data = _sanitize_data_for_reading(data)
         return data
 
     @staticmethod
@@ -524,18 +544,33 @@ class Fast5Read(AbstractFast5):
 
     def _load_raw(self, dataset_name, start, end, scale):
         try:
-            raw = self.handle[dataset_name][start:end]
+            dataset = self.handle[dataset_name]
+            if start is None and end is None:
+                # Reading the whole dataset skips building a hyperslab selection for the slice
+                raw = dataset[()]
+            else:
+                # python slice syntax allows None, https://docs.python.org/3/library/functions.html#slice
+                raw = dataset[start:end]
         except OSError as err:
             raise_missing_vbz_error_write(err)
         if scale:
-            channel_info = self.handle[self.global_key + 'channel_id'].attrs
+            offset, scaling = self._get_raw_scaling()
+            # Work in float32 throughout (int16 signal is exact in float32) rather than casting a float64 result down
+            # This halves the memory traffic and avoids a float64 temporary the size of the signal
+            raw = np.add(raw, offset, dtype=np.float32)
+            raw *= scaling
+        return raw
+
+    def _get_raw_scaling(self):
+        # Reading the channel_id attributes costs several HDF5 calls, so only do it once per read
+        # NB: this is reset by add_channel_info, but not if the attributes are changed directly through the handle
+        if self._raw_scaling is None:
+            channel_info = self._global_group['channel_id'].attrs
             digi = channel_info['digitisation']
             parange = channel_info['range']
             offset = channel_info['offset']
-            scaling = parange / digi
-            # python slice syntax allows None, https://docs.python.org/3/library/functions.html#slice
-            raw = np.array(scaling * (raw + offset), dtype=np.float32)
-        return raw
+            self._raw_scaling = (np.float32(offset), np.float32(parange / digi))
+        return self._raw_scaling
 
     def _add_group(self, group, attrs):
         """
@@ -543,15 +578,17 @@ class Fast5Read(AbstractFast5):
         :param attrs:
         :return:
         """
-        self.handle.create_group(group)
+        output_group = self.handle.create_group(group)
         if attrs is not None:
-            self._add_attributes(group, attrs)
+            # Write straight onto the new group rather than looking it up again by path
+            copy_attributes(attrs, output_group)
 
     def _add_attributes(self, path, attrs, clear=False):
         path_grp = self.handle[path]
         path_attr = path_grp.attrs
         if clear:
-            for key in path_attr.keys():
+            # Take the names up front, rather than deleting from the attributes while iterating over them
+            for key in list(path_attr.keys()):
                 del path_attr[key]
 
         copy_attributes(attrs, path_grp)
@@ -562,15 +599,24 @@ class Fast5Read(AbstractFast5):
             self._add_group(path, data)
 
     def _parse_attribute_tree(self, group):
+        """ Read the attributes of each subgroup of a group, given as an h5py.Group or a path """
+        if isinstance(group, str):
+            group = self.handle[group]
         data = {}
-        folders = self.handle[group].keys()
-        for folder in folders:
-            path = '{}/{}'.format(group, folder)
-            attr = self.handle[path].attrs.items()
-            data[folder] = {key: _clean(value) for key, value in attr}
+        # Iterate the subgroups directly rather than looking each one up again by its full path
+        for folder, subgroup in group.items():
+            data[folder] = {key: _clean(value) for key, value in subgroup.attrs.items()}
         return data
 
 
+def signal_chunk_shape(data):
+    """ The chunk shape to write a raw signal with """
+    if len(data) == 0:
+        # Chunks can't be larger than an empty dataset, so leave those to h5py
+        return True
+    return (min(len(data), SIGNAL_CHUNK_SIZE),)
+
+
 def copy_attributes(input_attrs: Union[h5py.AttributeManager, Dict[Any, Any]], output_group: h5py.Group):
     """ Copy the members of a given h5py.AttributeManager into an output h5py.Group"""
     if isinstance(input_attrs, h5py.AttributeManager):
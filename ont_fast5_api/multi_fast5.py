@@ -7,12 +7,13 @@ from ont_fast5_api.static_data import HARDLINK_GROUPS, OPTIONAL_READ_GROUPS
 
 
 class MultiFast5File(AbstractFast5):
-    def __init__(self, filename, mode='r', driver=None):
+    def __init__(self, filename, mode='r', driver=None, **kwargs):
         # See https://docs.h5py.org/en/stable/high/file.html#file-drivers for
         # information on why you might want to use a specific driver.
+        # Any further kwargs (e.g. chunk cache settings rdcc_nbytes/rdcc_nslots) are passed on to h5py.File
         self.filename = filename
         self.mode = mode
-        self.handle = h5py.File(self.filename, self.mode, driver=driver)
+        self.handle = h5py.File(self.filename, self.mode, driver=driver, **kwargs)
         self._run_id_map = None
         if mode != 'r' and 'file_version' not in self.handle.attrs:
             try:
@@ -102,16 +103,19 @@ class MultiFast5File(AbstractFast5):
                 output_read.add_raw_data(raw_data, raw_attrs, compression=target_compression)
                 continue
             elif subgroup in HARDLINK_GROUPS:
-                if read_to_add.run_id in self.run_id_map:
+                # run_id is read from the tracking_id attributes, so only look it up once
+                run_id = read_to_add.run_id
+                if run_id in self.run_id_map:
                     # There may be a group to link to, but we must check it actually exists!
-                    hardlink_source = "read_{}/{}".format(self.run_id_map[read_to_add.run_id], subgroup)
+                    hardlink_source = "read_{}/{}".format(self.run_id_map[run_id], subgroup)
                     if hardlink_source in self.handle:
                         hardlink_dest = "read_{}/{}".format(read_to_add.read_id, subgroup)
                         self.handle[hardlink_dest] = self.handle[hardlink_source]
                         continue
                 # If we couldn't hardlink to anything we need to make the group we create available for future reads
-                self.run_id_map[read_to_add.run_id] = read_to_add.read_id
+                self.run_id_map[run_id] = read_to_add.read_id
             # If we haven't done a special-case copy then we can fall back on the default copy
+            # NB: Group.copy() is H5Ocopy, which transfers compressed chunks as-is without re-running the filters
             output_group.copy(read_to_add.handle[subgroup], subgroup)
 
     def _add_read_from_single(self, read_to_add, target_compression, sanitize=False):
@@ -124,22 +128,26 @@ class MultiFast5File(AbstractFast5):
                 # skip optional groups when sanitizing
                 continue
             elif subgroup == "UniqueGlobalKey":
-                for unique_group in read_to_add.handle["UniqueGlobalKey"]:
-                    if unique_group in HARDLINK_GROUPS and read_to_add.run_id in self.run_id_map:
-                        hardlink_source = "read_{}/{}".format(self.run_id_map[read_to_add.run_id], unique_group)
+                # run_id is read from the tracking_id attributes, so only look it up once
+                run_id = read_to_add.run_id
+                unique_global_key = read_to_add.handle["UniqueGlobalKey"]
+                for unique_group in unique_global_key:
+                    if unique_group in HARDLINK_GROUPS and run_id in self.run_id_map:
+                        hardlink_source = "read_{}/{}".format(self.run_id_map[run_id], unique_group)
                         if hardlink_source in self.handle:
                             hardlink_dest = "read_{}/{}".format(read_to_add.read_id, unique_group)
                             self.handle[hardlink_dest] = self.handle[hardlink_source]
                     else:
-                        output_group.copy(read_to_add.handle["UniqueGlobalKey/{}".format(unique_group)],
-                                          unique_group)
-                self.run_id_map[read_to_add.run_id] = read_to_add.read_id
+                        output_group.copy(unique_global_key[unique_group], unique_group)
+                self.run_id_map[run_id] = read_to_add.read_id
             elif subgroup == "Raw":
-                if target_compression is None or str(target_compression) in read_to_add.raw_compression_filters:
-                    output_group.copy(read_to_add.handle[read_to_add.raw_dataset_group_name], "Raw")
+                # Resolve the 'Raw/Reads/Read_{read_number}' group once rather than on each property access
+                raw_group = read_to_add.handle[read_to_add.raw_dataset_group_name]
+                if target_compression is None or str(target_compression) in raw_group["Signal"]._filters:
+                    output_group.copy(raw_group, "Raw")
                 else:
-                    raw_attrs = read_to_add.handle[read_to_add.raw_dataset_group_name].attrs
-                    raw_data = read_to_add.handle[read_to_add.raw_dataset_name]
+                    raw_attrs = raw_group.attrs
+                    raw_data = raw_group["Signal"]
                     output_read = self.get_read(read_to_add.read_id)
                     output_read.add_raw_data(raw_data, raw_attrs, compression=target_compression)
             else:
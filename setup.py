@@ -25,8 +25,7 @@ if 'IGNORE_INCLUDES' not in os.environ:
     installation_requirements = ['h5py>=3',
                                  'numpy>=1.16',
                                  'packaging',
-                                 'progressbar33>=2.3.1',
-                                 'setuptools']
+                                 'progressbar33>=2.3.1']
 
 setup(name=__pkg_name__.replace("_", "-"),
       author='Oxford Nanopore Technologies, Limited',
@@ -29,6 +29,12 @@ class TestDataSanitisation(TestFast5ApiHelper):
 
         self.assertEqual(_clean(array([1, 2, 3])), [1, 2, 3])
 
+        # numpy scalars should become the equivalent python types
+        for value, expected in ((np.int64(3), 3), (np.uint8(3), 3), (np.float64(0.5), 0.5), (np.bool_(True), True),
+                                (np.bytes_(b'str'), 'str'), (np.str_('str'), 'str')):
+            self.assertEqual(_clean(value), expected)
+            self.assertIs(type(_clean(value)), type(expected))
+
     def test__sanitize_data(self):
         # We expect conversion from utf8 to bytestrings and vice-versa
         test_string = 'Avast'
@@ -43,6 +49,17 @@ class TestDataSanitisation(TestFast5ApiHelper):
         self.assertEqual(np.char.encode(test_array),
                          _sanitize_data_for_writing(test_array))
 
+        # Non-ASCII byte-strings fall back on utf-8 decoding
+        test_array = array(['Ahoy', 'Ahøy'], dtype=str)
+        self.assertTrue(np.array_equal(test_array,
+                                       _sanitize_data_for_reading(np.char.encode(test_array))))
+        self.assertEqual(_clean(np.char.encode(test_array)), ['Ahoy', 'Ahøy'])
+
+        # Decoded arrays are as wide as their longest string, whichever decoding path is taken
+        for test_array in (array([b'ab', b'c'], dtype='S10'), array([b'ab', 'ø'.encode()], dtype='S10')):
+            self.assertEqual(np.char.decode(test_array).dtype, _sanitize_data_for_reading(test_array).dtype)
+        self.assertEqual(dtype('<U2'), _sanitize_data_for_reading(array([b'ab', b'c'], dtype='S10')).dtype)
+
         test_ndarray_utf8 = array([('Narr', 0)],
                                   dtype=[('string', (str, 4)),
                                          ('int', int)])
@@ -82,6 +99,24 @@ class TestDataSanitisation(TestFast5ApiHelper):
         output_recarray = _sanitize_data_for_writing(input_rec)
         self.assertEqual(expected_types, output_recarray.dtype)
 
+    def test_sanitise_packed_array_string_widths(self):
+        # A packed dtype puts the unicode field at an unaligned offset, its width is still 4 bytes per character
+        input_array = array([(1, 'ACGTA')], dtype=np.dtype([('flag', 'u1'), ('bases', 'U5')], align=False))
+        output_array = _sanitize_data_for_writing(input_array)
+        self.assertEqual(dtype([('flag', 'u1'), ('bases', 'S5')]), output_array.dtype)
+        self.assertEqual(b'ACGTA', output_array['bases'][0])
+        self.assertTrue(np.array_equal(input_array, _sanitize_data_for_reading(output_array)))
+
+    def test_sanitise_numeric_compound_array(self):
+        # Compound arrays without any string fields keep their dtype, but are still returned as a copy
+        input_array = array([(1.5, 10, 3)], dtype=[('mean', 'f8'), ('start', 'i8'), ('length', 'u4')])
+        for sanitise in (_sanitize_data_for_writing, _sanitize_data_for_reading):
+            output_array = sanitise(input_array)
+            self.assertIsNot(input_array, output_array)
+            self.assertFalse(np.shares_memory(input_array, output_array))
+            self.assertEqual(input_array.dtype, output_array.dtype)
+            self.assertTrue(np.array_equal(input_array, output_array))
+
     def test_real_example_file(self):
         with MultiFast5File(os.path.join(test_data, 'rle_basecall_table', 'rle_example.fast5'), 'r') as mf5:
             for read in mf5.get_reads():
@@ -22,6 +22,7 @@ class TestDemuxFast5(TestFast5ApiHelper):
                            demultiplex_column="barcode_arrangement",threads=1)
         demux.run_batch()
         self.check_output(output_dir)
+        self.assertEqual(sum(worker.reads_extracted for worker in demux.workers), 4)
 
     @patch('ont_fast5_api.conversion_tools.demux_fast5.logging')
     @patch('ont_fast5_api.conversion_tools.conversion_utils.ProgressBar')
@@ -35,6 +35,22 @@ class TestFast5ConversionUtilities(TestFast5ApiHelper):
             self.assertTrue(Path(f5_path).is_file(), "Filepath is not a file")
             self.assertTrue(f5_path.endswith('.fast5'), "Filepath does not end with fast5 extension")
 
+    def test_yield_fast5_files_recursive(self):
+        root = Path(self.save_path)
+        (root / "sub" / "subsub").mkdir(parents=True)
+        for path in (root / "a.fast5", root / "sub" / "b.fast5", root / "sub" / "subsub" / "c.fast5",
+                     root / "sub" / "not_fast5.txt"):
+            path.touch()
+        (root / "link").symlink_to(root / "sub", target_is_directory=True)
+
+        found = set(yield_fast5_files(str(root), recursive=True, follow_symlinks=False))
+        expected = {str(root / "a.fast5"), str(root / "sub" / "b.fast5"), str(root / "sub" / "subsub" / "c.fast5")}
+        self.assertEqual(found, expected)
+
+        found = set(yield_fast5_files(str(root), recursive=True, follow_symlinks=True))
+        expected.update({str(root / "link" / "b.fast5"), str(root / "link" / "subsub" / "c.fast5")})
+        self.assertEqual(found, expected)
+
     def test_yield_fast5_reads_from_fast5_file(self):
         f5_read_gen = yield_fast5_reads(self.fast5_path, recursive=False)
         read_id, read_data = next(f5_read_gen)
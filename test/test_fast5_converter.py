@@ -4,7 +4,8 @@ import os
 import h5py
 import numpy
 
-from ont_fast5_api.conversion_tools.multi_to_single_fast5 import convert_multi_to_single, try_multi_to_single_conversion
+from ont_fast5_api.conversion_tools.multi_to_single_fast5 import convert_multi_to_single, try_multi_to_single_conversion, \
+    batch_convert_multi_files_to_single
 from ont_fast5_api.conversion_tools.single_to_multi_fast5 import batch_convert_single_to_multi, get_fast5_file_list, \
     create_multi_read_file
 from ont_fast5_api.multi_fast5 import MultiFast5File
@@ -30,6 +31,8 @@ class TestFast5Converter(TestFast5ApiHelper):
             if read_count > 0:
                 with h5py.File(os.path.join(self.save_path, file), 'r') as f5:
                     self.assertEqual(len(f5), read_count)
+        with open(os.path.join(self.save_path, "filename_mapping.txt")) as mapping:
+            self.assertEqual(len(mapping.readlines()), file_count)
 
     def test_multi_to_single(self):
         input_file = os.path.join(test_data, "multi_read", "batch_0.fast5")
@@ -44,6 +47,44 @@ class TestFast5Converter(TestFast5ApiHelper):
         self.assertEqual(len(out_files), read_count)
         self.assertEqual(out_files, [f.format(subfolder) for f in expected_files])
 
+        with MultiFast5File(input_file, 'r') as multi_f5:
+            for out_file in out_files:
+                with Fast5File(out_file, 'r') as single_f5:
+                    multi_read = multi_f5.get_read(single_f5.read_id)
+                    self.assertTrue(numpy.array_equal(single_f5.get_raw_data(), multi_read.get_raw_data()))
+                    self.assertEqual(single_f5.get_tracking_id(), multi_read.get_tracking_id())
+
+    def test_multi_to_single_external_links(self):
+        input_file = os.path.join(test_data, "multi_read", "batch_0.fast5")
+        convert_multi_to_single(input_file, self.save_path, '0', external_links=True)
+
+        out_files = get_fast5_file_list(os.path.join(self.save_path, '0'), recursive=False)
+        with MultiFast5File(input_file, 'r') as multi_f5:
+            self.assertEqual(len(out_files), len(multi_f5.get_read_ids()))
+            for out_file in out_files:
+                with h5py.File(out_file, 'r') as handle:
+                    link = handle.get("UniqueGlobalKey/tracking_id", getlink=True)
+                    self.assertIsInstance(link, h5py.ExternalLink)
+                with Fast5File(out_file, 'r') as single_f5:
+                    multi_read = multi_f5.get_read(single_f5.read_id)
+                    self.assertTrue(numpy.array_equal(single_f5.get_raw_data(), multi_read.get_raw_data()))
+                    self.assertEqual(single_f5.get_channel_info(), multi_read.get_channel_info())
+
+    @patch('ont_fast5_api.conversion_tools.multi_to_single_fast5.get_progress_bar')
+    def test_multi_to_single_split_reads(self, mock_pbar):
+        # a single input file with more threads than files is split across several tasks
+        input_file = os.path.join(test_data, "multi_read", "batch_0.fast5")
+        with MultiFast5File(input_file, 'r') as f5:
+            expected_files = sorted([os.path.join(self.save_path, "0", i + '.fast5') for i in f5.get_read_ids()])
+
+        batch_convert_multi_files_to_single(input_file, self.save_path, threads=3, recursive=False,
+                                            follow_symlinks=True)
+
+        out_files = sorted(get_fast5_file_list(os.path.join(self.save_path, "0"), recursive=False))
+        self.assertEqual(out_files, expected_files)
+        with open(os.path.join(self.save_path, "filename_mapping.txt")) as mapping:
+            self.assertEqual(len(mapping.readlines()), len(expected_files))
+
     @disable_logging
     def test_single_to_multi_incorrect_types(self):
         input_files = [os.path.join(test_data, "multi_read", "batch_0.fast5")]
@@ -61,5 +102,5 @@ class TestFast5Converter(TestFast5ApiHelper):
                 MultiFast5File(self.generate_temp_filename(), 'w') as multi_out:
             multi_out.add_existing_read(single_fast5)
             expected_raw = single_fast5.get_raw_data()
-            actual_raw = multi_out.get_read(single_fast5.get_read_id()).get_raw_data()
+            actual_raw = multi_out.get_read(single_fast5.read_id).get_raw_data()
             self.assertTrue(numpy.array_equal(actual_raw, expected_raw))
@@ -7,9 +7,12 @@ import os
 from shutil import copyfile
 from tempfile import NamedTemporaryFile
 
+import h5py
+import numpy
+
 from ont_fast5_api import CURRENT_FAST5_VERSION
 from ont_fast5_api.fast5_info import Fast5Info, _clean
-from ont_fast5_api.fast5_file import Fast5File
+from ont_fast5_api.fast5_file import Fast5File, Fast5FileTypeError
 from test.helpers import TestFast5ApiHelper, test_data
 
 
@@ -24,6 +27,21 @@ class TestFast5File(TestFast5ApiHelper):
             group_name = fh.get_latest_analysis('Garbage_5D')
             self.assertEqual(None, group_name)
 
+    def test_open_modes(self):
+        single_read = os.path.join(test_data, 'single_reads', 'read0.fast5')
+        for mode in ('r', 'r+', 'a'):
+            test_file = os.path.join(self.save_path, 'open_{}.fast5'.format(mode.replace('+', 'plus')))
+            copyfile(single_read, test_file)
+            with Fast5File(test_file, mode=mode) as fh:
+                self.assertTrue(fh.status.valid)
+                self.assertEqual(1, len(fh.status.read_info))
+                self.assertEqual(fh.read_id, Fast5Info(test_file).read_info[0].read_id)
+        # Opening a missing file for append shouldn't create an (invalid) empty file
+        missing_file = os.path.join(self.save_path, 'missing.fast5')
+        with self.assertRaises(Fast5FileTypeError):
+            Fast5File(missing_file, mode='a')
+        self.assertFalse(os.path.exists(missing_file))
+
     def test_002_read_summary_data(self):
         test_file = os.path.join(test_data, 'telemetry_test.fast5')
         summary = Fast5File.read_summary_data(test_file, 'segmentation')
@@ -87,6 +105,8 @@ class TestFast5File(TestFast5ApiHelper):
         # Copy file and Update to current format.
         new_file = os.path.join(self.save_path, 'single_read_v0.6_test.fast5')
         copyfile(fname, new_file)
+        with h5py.File(fname, 'r') as fh:
+            old_events = fh['Analyses/EventDetection_000/Reads/Read_5804/Events'][()]
         Fast5File.update_legacy_file(new_file)
         result = Fast5Info(new_file)
         self.assertEqual(CURRENT_FAST5_VERSION, result.version)
@@ -100,6 +120,8 @@ class TestFast5File(TestFast5ApiHelper):
             data = fh.get_analysis_dataset(group, 'Events')
             self.assertEqual(8433, data.size)
             self.assertEqual(set(('mean', 'stdv', 'start', 'length')), set(data.dtype.names))
+            self.assertTrue(numpy.allclose(data['stdv'], numpy.sqrt(old_events['variance'])))
+            self.assertTrue(numpy.array_equal(data['start'], old_events['start']))
             read_info = fh.status.read_info[0]
             self.assertEqual(8433, read_info.event_data_count)
             channel_info = fh.get_channel_info()
@@ -133,6 +155,20 @@ class TestFast5File(TestFast5ApiHelper):
             raw = fh.get_raw_data(read_number=627)
             self.assertEqual(46037, raw.size)
             self.assertEqual(46037, read_info.duration)
+            all_raw = fh.get_raw_data_multi()
+            self.assertEqual([627], list(all_raw))
+            numpy.testing.assert_array_equal(raw, all_raw[627])
+
+        # Legacy files can also hold the raw signal in a 'Data' dataset
+        legacy_file = self.generate_temp_filename()
+        copyfile(fname, legacy_file)
+        with h5py.File(legacy_file, 'r+') as handle:
+            handle.move('Raw/Reads/Read_627/Signal', 'Raw/Reads/Read_627/Data')
+        with Fast5File(legacy_file, mode='r') as fh:
+            self.assertTrue(fh.status.read_info[0].has_raw_data)
+            all_raw = fh.get_raw_data_multi()
+            self.assertEqual([627], list(all_raw))
+            numpy.testing.assert_array_equal(raw, all_raw[627])
 
     def test_012_v1_0_single(self):
         # Check that it is recognized properly.
@@ -237,6 +273,18 @@ class TestFast5File(TestFast5ApiHelper):
                                                 dataset_name='Example')
             self.assertEqual(answer, 'hello')
 
+            events = numpy.arange(100, dtype=float)
+            for compression in ('gzip', 'lzf', None):
+                dataset_name = 'Events_{}'.format(compression)
+                fast5.add_analysis_dataset(group_name=group_name,
+                                           dataset_name=dataset_name,
+                                           data=events,
+                                           compression=compression)
+                dataset = fast5.get_analysis_dataset(group_name, dataset_name, skip_decoding=True)
+                self.assertEqual(dataset.compression, compression)
+                self.assertEqual(dataset.shuffle, compression is not None)
+                numpy.testing.assert_array_equal(dataset[()], events)
+
     def test_fast5_set_analysis_config(self):
         fname = self.generate_temp_filename()
         group_name = 'First_000'
@@ -12,7 +12,9 @@ class TestFast5Interface(unittest.TestCase):
 
     def test_correct_type(self):
         single_read_path = os.path.join(test_data, "single_reads", "read0.fast5")
-        single_read_id = Fast5File(single_read_path).get_read_id()
+        single_read_id = Fast5File(single_read_path).read_id
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(single_read_id, Fast5File(single_read_path).get_read_id())
         with get_fast5_file(single_read_path) as f5:
             self.assertTrue(isinstance(f5, Fast5File))
             self.assertEqual(check_file_type(f5), SINGLE_READ)
@@ -31,3 +33,10 @@ class TestFast5Interface(unittest.TestCase):
         # Test we can get raw data using the same method for single and multi
         raw_data = f5.get_read(f5.get_read_ids()[0]).get_raw_data()
         self.assertTrue(len(raw_data) >= 0)
+
+    def test_h5py_kwargs_passed_through(self):
+        cache_bytes = 4 * 1024 * 1024
+        for path in (os.path.join(test_data, "single_reads", "read0.fast5"),
+                     os.path.join(test_data, "multi_read", "batch_0.fast5")):
+            with get_fast5_file(path, rdcc_nbytes=cache_bytes) as f5:
+                self.assertEqual(f5.handle.id.get_access_plist().get_cache()[2], cache_bytes)
@@ -1,11 +1,14 @@
 import os
+import h5py
 import numpy
+from multiprocessing import Pool
 from unittest.mock import patch
 from pathlib import Path
 
 from ont_fast5_api.compression_settings import VBZ
-from ont_fast5_api.conversion_tools.fast5_subset import Fast5Filter
-from ont_fast5_api.conversion_tools.conversion_utils import Fast5FilterWorker, extract_selected_reads, read_generator
+from ont_fast5_api.conversion_tools.fast5_subset import Fast5Filter, parse_summary_file
+from ont_fast5_api.conversion_tools.conversion_utils import Fast5FilterWorker, extract_selected_reads, read_generator, \
+    get_cached_read_ids, _file_locking_option_supported, INPUT_FILE_SETTINGS
 from ont_fast5_api.multi_fast5 import MultiFast5File
 from ont_fast5_api.fast5_file import Fast5File
 from test.helpers import TestFast5ApiHelper, test_data
@@ -23,6 +26,51 @@ class TestFast5Subset(TestFast5ApiHelper):
 
         self.assertEqual(len(self.read_set), count)
 
+    def test_get_cached_read_ids(self):
+        with MultiFast5File(str(self.input_multif5_path), 'r') as input_f5:
+            read_ids = get_cached_read_ids(input_f5, self.input_multif5_path)
+            self.assertEqual(read_ids, tuple(input_f5.get_read_ids()))
+            # a second lookup of the unmodified file reuses the cached list
+            self.assertIs(read_ids, get_cached_read_ids(input_f5, self.input_multif5_path))
+
+    def test_file_locking_option_supported(self):
+        # The option needs both a new enough h5py and a new enough HDF5 library
+        for h5py_version, hdf5_version, expected in (((3, 4, 0), (1, 12, 1), False),
+                                                     ((3, 5, 0), (1, 10, 6), False),
+                                                     ((3, 5, 0), (1, 10, 7), True),
+                                                     ((3, 5, 0), (1, 12, 0), False),
+                                                     ((3, 5, 0), (1, 12, 1), True),
+                                                     ((3, 5, 0), (1, 14, 0), True)):
+            with patch.object(h5py.version, 'version_tuple', h5py_version), \
+                    patch.object(h5py.version, 'hdf5_version_tuple', hdf5_version):
+                self.assertEqual(expected, _file_locking_option_supported(), msg=(h5py_version, hdf5_version))
+
+        # Whatever was decided for this environment, h5py must accept the input file settings
+        with MultiFast5File(str(self.input_multif5_path), 'r', **INPUT_FILE_SETTINGS) as input_f5:
+            self.assertTrue(input_f5.get_read_ids())
+
+    def test_parse_summary_file(self):
+        read_ids = sorted(self.read_set)
+        contents = {
+            'no_header.txt': "\n".join(read_ids) + "\n",
+            'single_column.txt': "read_id\n" + "\n".join(read_ids) + "\n\n",
+            'multi_column.tsv': "filename\tread_id\tlength\n" +
+                                "".join("batch0.fast5\t{}\t100\n".format(read_id) for read_id in read_ids),
+            'multi_column_blank_lines.tsv': "a\tread_id\n" +
+                                            "".join("x\t{}\n".format(read_id) for read_id in read_ids) + "\n",
+        }
+        for filename, content in contents.items():
+            path = os.path.join(self.save_path, filename)
+            with open(path, 'w') as fh:
+                fh.write(content)
+            self.assertEqual(parse_summary_file(path), self.read_set, msg=filename)
+
+        path = os.path.join(self.save_path, 'no_read_id.tsv')
+        with open(path, 'w') as fh:
+            fh.write("filename\tlength\nbatch0.fast5\t100\n")
+        with self.assertRaises(TypeError):
+            parse_summary_file(path)
+
     def _create_read_list_file(self, read_ids):
         output_path = os.path.join(self.save_path, 'read_list.txt')
         with open(output_path, 'w') as fh:
@@ -44,7 +92,7 @@ class TestFast5Subset(TestFast5ApiHelper):
         with MultiFast5File(os.path.join(self.save_path, 'batch0.fast5'), 'r') as output_f5:
             for input_file in os.listdir(input_path):
                 with Fast5File(os.path.join(input_path, input_file), 'r') as input_f5:
-                    read_id = input_f5.get_read_id()
+                    read_id = input_f5.read_id
                     if read_id in self.read_set:
                         read_in = input_f5.get_read(read_id)
                         read_out = output_f5.get_read(read_id)
@@ -52,6 +100,46 @@ class TestFast5Subset(TestFast5ApiHelper):
                         count += 1
         self.assertEqual(len(self.read_set), count)
 
+    @patch('ont_fast5_api.conversion_tools.fast5_subset.logging')
+    @patch('ont_fast5_api.conversion_tools.fast5_subset.get_progress_bar')
+    def test_subset_from_single_multiprocess(self, mock_log, mock_pbar):
+        input_path = os.path.join(test_data, "single_reads")
+        read_list = self._create_read_list_file(self.read_set)
+        f5_filter = Fast5Filter(input_folder=input_path,
+                                output_folder=self.save_path,
+                                read_list_file=read_list,
+                                batch_size=1,
+                                threads=2)
+        f5_filter.run_batch()
+
+        self.assertEqual(f5_filter.worker.reads_extracted, len(self.read_set))
+        output_reads = set()
+        for output_file in ('batch0.fast5', 'batch1.fast5'):
+            with MultiFast5File(os.path.join(self.save_path, output_file), 'r') as output_f5:
+                output_reads.update(output_f5.get_read_ids())
+        self.assertEqual(self.read_set, output_reads)
+
+        with open(os.path.join(self.save_path, 'filename_mapping.txt')) as mapping:
+            mapped_reads = {line.split('\t')[0] for line in mapping}
+        self.assertEqual(self.read_set, mapped_reads)
+
+    @patch('ont_fast5_api.conversion_tools.fast5_subset.logging')
+    @patch('ont_fast5_api.conversion_tools.fast5_subset.get_progress_bar')
+    def test_subset_with_shared_pool(self, mock_log, mock_pbar):
+        input_path = os.path.join(test_data, "single_reads")
+        read_list = self._create_read_list_file(self.read_set)
+        with Pool(2) as pool:
+            # the same pool can be reused by several filters
+            for output_name in ('first', 'second'):
+                output_folder = os.path.join(self.save_path, output_name)
+                f5_filter = Fast5Filter(input_folder=input_path,
+                                        output_folder=output_folder,
+                                        read_list_file=read_list,
+                                        pool=pool)
+                f5_filter.run_batch()
+                with MultiFast5File(os.path.join(output_folder, 'batch0.fast5'), 'r') as output_f5:
+                    self.assertEqual(self.read_set, set(output_f5.get_read_ids()))
+
     @patch('ont_fast5_api.conversion_tools.fast5_subset.logging')
     @patch('ont_fast5_api.conversion_tools.fast5_subset.get_progress_bar')
     def test_subset_from_multi(self, mock_log, mock_pbar):
@@ -75,7 +75,7 @@ class TestHardlinkMetaData(TestFast5ApiHelper):
         file_hardlinked = True
         with MultiFast5File(input_path, 'r') as f5_file:
             for read in f5_file.get_reads():
-                master_read_id = f5_file.run_id_map[read.get_run_id()]
+                master_read_id = f5_file.run_id_map[read.run_id]
                 for group in HARDLINK_GROUPS:
                     file_hardlinked &= self.is_read_hardlinked(f5_file, read.read_id, master_read_id, group)
         return file_hardlinked
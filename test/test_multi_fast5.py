@@ -3,7 +3,7 @@ import os
 import random
 
 from ont_fast5_api.fast5_file import Fast5File
-from ont_fast5_api.fast5_read import Fast5Read
+from ont_fast5_api.fast5_read import Fast5Read, SIGNAL_CHUNK_SIZE
 from ont_fast5_api.multi_fast5 import MultiFast5File
 from test.helpers import TestFast5ApiHelper
 
@@ -58,6 +58,14 @@ class TestMultiFast5(TestFast5ApiHelper):
             read0.add_raw_data(data, attrs=raw_attrs)
             output_data = read0.get_raw_data()
             numpy.testing.assert_array_equal(output_data, data)
+            self.assertEqual((10,), read0.handle[read0.raw_dataset_name].chunks)
+
+            # Long signals are split into fixed size chunks, and empty signals can still be written
+            read1, read2 = (multi_f5.get_read(read_id) for read_id in multi_f5.get_read_ids()[1:3])
+            read1.add_raw_data(numpy.zeros(100000, dtype=numpy.int16))
+            self.assertEqual((SIGNAL_CHUNK_SIZE,), read1.handle[read1.raw_dataset_name].chunks)
+            read2.add_raw_data([])
+            self.assertEqual(0, read2.get_raw_data().size)
 
     def test_channel_info(self):
         f5_file = self.create_multi_file(generate_read_ids(4))
@@ -77,6 +85,18 @@ class TestMultiFast5(TestFast5ApiHelper):
             output_data = read0.get_channel_info()
             self.assertEqual(output_data, expected_out)
 
+            # Scaled raw data should follow any update to the channel info
+            read0.add_raw_data(numpy.arange(10, dtype=numpy.int16), attrs={"duration": 10})
+            scaling = channel_info['range'] / channel_info['digitisation']
+            numpy.testing.assert_allclose(read0.get_raw_data(scale=True),
+                                          scaling * (numpy.arange(10) + channel_info['offset']), rtol=1e-6)
+            read0.add_channel_info({"offset": 0.0})
+            numpy.testing.assert_allclose(read0.get_raw_data(scale=True), scaling * numpy.arange(10), rtol=1e-6)
+
+            # clear should remove all of the existing attributes before adding the new ones
+            read0.add_channel_info({"channel_number": "7"}, clear=True)
+            self.assertEqual(read0.get_channel_info(), {"channel_number": 7})
+
     def test_tracking_id(self):
         f5_file = self.create_multi_file(generate_read_ids(4))
         tracking_id = {